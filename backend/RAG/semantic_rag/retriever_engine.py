@@ -5,15 +5,16 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain.schema import Document
 from langchain_community.document_loaders import TextLoader
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_groq import ChatGroq
 
 load_dotenv()
 
+from embeddings_backend import load_embeddings
+
 class SemanticRAG:
     def __init__(self):
         self.vectorstore_path = "chroma_store"
-        self.embedding = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        self.embedding = load_embeddings()
         self.llm = ChatGroq(
             groq_api_key=os.getenv("GROQ_API_KEY"),
             model_name="meta-llama/llama-4-maverick-17b-128e-instruct"
@@ -1,21 +1,27 @@
+import atexit
 import streamlit as st
 from RAG.graph_query_engine import GraphRAG
 from RAG.semantic_rag.retriever_engine import SemanticRAG
 
-# Initialize RAG Engines
-graph_rag = GraphRAG()
-semantic_rag = SemanticRAG()
-
 # UI Setup
 st.set_page_config(page_title="Smart RAG Assistant", layout="wide")
-st.title("🧠 Smart AI Help Bot")
 
-user_query = st.text_input("Ask your question here:")
+# RAG engines are process-wide: built once, shared by every session and rerun
+@st.cache_resource
+def load_graph_rag():
+    engine = GraphRAG()
+    atexit.register(engine.close)
+    return engine
 
-if st.button("Get Answer") and user_query:
-    st.markdown("### 💡 Answer")
+@st.cache_resource
+def load_semantic_rag():
+    return SemanticRAG()
+
+graph_rag = load_graph_rag()
+semantic_rag = load_semantic_rag()
 
-    graph_answer, semantic_answer = None, None
+def answer_query(user_query):
+    graph_answer, semantic_answer, final_answer = None, None, None
     errors = []
 
     # Try Graph RAG
@@ -30,16 +36,7 @@ if st.button("Get Answer") and user_query:
     except Exception as e:
         errors.append(f"Semantic RAG failed: {e}")
 
-    # Decision Logic
-    if graph_answer and not semantic_answer:
-        st.markdown("#### 📊 From Graph RAG")
-        st.success(graph_answer)
-
-    elif semantic_answer and not graph_answer:
-        st.markdown("#### 📄 From Semantic RAG")
-        st.success(semantic_answer)
-
-    elif graph_answer and semantic_answer:
+    if graph_answer and semantic_answer:
         combined_prompt = f"""
 You are an intelligent assistant helping a user by combining structured data from a knowledge graph and unstructured data from semantic retrieval.
 
@@ -55,10 +52,54 @@ Provide a clear, helpful, and final response to the user:
 """
         try:
             final_answer = semantic_rag.llm.invoke(combined_prompt).content.strip()
-            st.markdown("#### 🔁 Combined RAG Answer")
-            st.success(final_answer)
         except Exception as e:
             errors.append(f"Final LLM generation failed: {e}")
+
+    return {
+        "graph_answer": graph_answer,
+        "semantic_answer": semantic_answer,
+        "final_answer": final_answer,
+        "errors": errors,
+    }
+
+st.title("🧠 Smart AI Help Bot")
+
+user_query = st.text_input("Ask your question here:")
+
+# Per-session results, so reruns re-render instead of re-querying
+results = st.session_state.setdefault("results", {})
+
+if st.button("Get Answer") and user_query:
+    # Results with errors are kept only for display; asking again retries them
+    cached = results.get(user_query)
+    if cached is None or cached["errors"]:
+        results[user_query] = answer_query(user_query)
+    st.session_state["last_query"] = user_query
+
+result = results.get(st.session_state.get("last_query"))
+
+if result:
+    st.markdown("### 💡 Answer")
+
+    graph_answer = result["graph_answer"]
+    semantic_answer = result["semantic_answer"]
+    final_answer = result["final_answer"]
+    errors = result["errors"]
+
+    # Decision Logic
+    if graph_answer and not semantic_answer:
+        st.markdown("#### 📊 From Graph RAG")
+        st.success(graph_answer)
+
+    elif semantic_answer and not graph_answer:
+        st.markdown("#### 📄 From Semantic RAG")
+        st.success(semantic_answer)
+
+    elif graph_answer and semantic_answer:
+        if final_answer:
+            st.markdown("#### 🔁 Combined RAG Answer")
+            st.success(final_answer)
+        else:
             st.markdown("#### ⚠️ Partial Combined Results")
             st.markdown("**📊 Graph RAG:**")
             st.info(graph_answer)
@@ -1,17 +1,32 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 from neo4j import GraphDatabase
-from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
+import gzip
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
-import json
 from typing import List, Dict
 
+# Local modules read their settings at import time, so backend/.env must be loaded first
 load_dotenv()
 
+from graph_context import build_graph_context, GraphRow, STOPWORDS
+from entity_index import LexicalEntityIndex
+from embeddings_backend import load_embeddings
+from llm_router import LLMRouter, is_complex_question
+from llm_resilience import LLMUnavailable, deadline_scope
+from embedding_service import BatchingEmbeddingService
+from singleflight import SingleFlight, normalize_query
+from data.triplet_ingestion import k_hop_neighborhood
+from data.graph_layout import LAYOUT_PATH
+from vector_index import build_vector_store, apply_search_params, FAISS_INDEX_TYPE
+from graph_api import (seed_subgraph, expand_node, viewport_subgraph, compact_json, TTLCache,
+                       GRAPH_SEED_LIMIT, GRAPH_EXPAND_LIMIT, GRAPH_VIEWPORT_LIMIT, GRAPH_MAX_NODES)
+
 app = Flask(__name__)
 CORS(app)
 
@@ -25,67 +40,177 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FAISS_INDEX_PATH = os.path.join(BASE_DIR, "faiss_index")
+# Bump when the documents stored in the index change shape; older indexes are rebuilt on load.
+# 2: relationship docs are RELATES.type predicates with frequencies, entity docs carry aliases
+FAISS_INDEX_VERSION = "2"
+FAISS_INDEX_VERSION_PATH = os.path.join(FAISS_INDEX_PATH, "index_version")
 
 driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
-llm = ChatGroq(
-    groq_api_key=GROQ_API_KEY,
-    model_name="meta-llama/llama-4-maverick-17b-128e-instruct",
-    temperature=0.1,
-)
+router = LLMRouter(GROQ_API_KEY)
 
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+embeddings = BatchingEmbeddingService(load_embeddings())
 
 vector_store = None
 entity_cache = {}
 relationship_cache = {}
-
-import os
+entity_index = LexicalEntityIndex()
+predicate_index = {}
+inflight_queries = SingleFlight()
+graph_cache = TTLCache()
+
+ALIAS_LEARN_THRESHOLD = float(os.getenv("ALIAS_LEARN_THRESHOLD", "0.75"))
+MAX_ASK_DEPTH = int(os.getenv("MAX_ASK_DEPTH", "3"))
+ASK_DEADLINE_SECONDS = float(os.getenv("ASK_DEADLINE_SECONDS", "20"))
+DEGRADED_MAX_FACTS = 10
+WARM_UP_RETRY_MAX_SECONDS = 60
+FACT_CARD_MIN_SCORE = float(os.getenv("FACT_CARD_MIN_SCORE", "0.85"))
+
+LOOKUP_PATTERNS = [
+    re.compile(r"^(?:what|who)\s*(?:is|are|was|were|'s)\s+(?:the\s+|an?\s+)?(?P<entity>.+?)\s*[?.!]*$", re.IGNORECASE),
+    re.compile(r"^(?:tell me about|define|describe|explain)\s+(?:the\s+)?(?P<entity>.+?)\s*[?.!]*$", re.IGNORECASE),
+]
+
+vector_store_lock = threading.Lock()
+warm_up_lock = threading.Lock()
+ready = threading.Event()
+warm_up_error = None
 
 def initialize_vector_store(force_rebuild=False):
-    global vector_store, entity_cache, relationship_cache
-
-    try:
-        if os.path.exists(FAISS_INDEX_PATH) and not force_rebuild:
-            print("Loading FAISS index from disk...")
-            vector_store = FAISS.load_local(FAISS_INDEX_PATH, embeddings, allow_dangerous_deserialization=True)
-            print("FAISS index loaded.")
-            return
+    global vector_store, entity_cache, relationship_cache, entity_index, predicate_index
+
+    with vector_store_lock:
+        try:
+            if os.path.exists(FAISS_INDEX_PATH) and not force_rebuild and not index_is_current():
+                print(f"FAISS index on disk predates version {FAISS_INDEX_VERSION}, rebuilding...")
+            elif os.path.exists(FAISS_INDEX_PATH) and not force_rebuild:
+                print("Loading FAISS index from disk...")
+                vector_store = FAISS.load_local(FAISS_INDEX_PATH, embeddings, allow_dangerous_deserialization=True)
+                apply_search_params(vector_store.index)
+                entities, relationship_cache = build_caches_from_index(vector_store)
+                entity_cache, entity_index = build_entity_lookups(entities)
+                predicate_index = build_predicate_index(relationship_cache)
+                print(f"FAISS index loaded ({len(entity_cache)} entities, {len(relationship_cache)} relationship types cached).")
+                return
         
-        print("Building FAISS index from Neo4j...")
+            print("Building FAISS index from Neo4j...")
+
+            entities = get_all_entities()
+            entity_cache, entity_index = build_entity_lookups(entities)
+
+            relationships = get_all_relationship_types()
+            relationship_cache = {rel['type'].lower(): rel for rel in relationships}
+            predicate_index = build_predicate_index(relationship_cache)
+
+            documents = []
+
+            for entity in entities:
+                doc = Document(
+                    page_content=f"Entity: {entity['name']} {entity.get('description', '') or ''}",
+                    metadata={"type": "entity", "name": entity['name'], "id": entity.get('id'), "aliases": entity.get('aliases') or []}
+                )
+                documents.append(doc)
+
+            for rel in relationships:
+                doc = Document(
+                    page_content=f"Relationship: {rel['type']}",
+                    metadata={"type": "relationship", "name": rel['type'], "frequency": rel.get('frequency')}
+                )
+                documents.append(doc)
+
+            if documents:
+                vector_store = build_vector_store(documents, embeddings)
+                print(f"Vector store initialized with {len(documents)} documents ({FAISS_INDEX_TYPE} index)")
+
+                vector_store.save_local(FAISS_INDEX_PATH)
+                with open(FAISS_INDEX_VERSION_PATH, "w") as f:
+                    f.write(FAISS_INDEX_VERSION)
+                print("FAISS index saved to disk.")
+            else:
+                print("No documents found to create vector store.")
+
+        except Exception as e:
+            print(f"Error initializing vector store: {e}")
+
+def index_is_current() -> bool:
+    """Whether the on-disk index was built with the current document layout"""
+    try:
+        with open(FAISS_INDEX_VERSION_PATH) as f:
+            return f.read().strip() == FAISS_INDEX_VERSION
+    except FileNotFoundError:
+        return False
 
-        entities = get_all_entities()
-        entity_cache = {entity['name'].lower(): entity for entity in entities}
+def build_entity_lookups(entities: List[Dict]):
+    """Exact-name cache and lexical index over entity names and their merged-in aliases"""
+    cache = {entity['name'].lower(): entity for entity in entities}
+    index = LexicalEntityIndex.from_names(entity['name'] for entity in entities)
 
-        relationships = get_all_relationship_types()
-        relationship_cache = {rel['type'].lower(): rel for rel in relationships}
+    for entity in entities:
+        for alias in entity.get('aliases') or []:
+            cache.setdefault(alias.lower(), entity)
+            index.add_alias(alias, entity['name'], 1.0)
 
-        documents = []
+    return cache, index
 
-        for entity in entities:
-            doc = Document(
-                page_content=f"Entity: {entity['name']} {entity.get('description', '') or ''}",
-                metadata={"type": "entity", "name": entity['name'], "id": entity.get('id')}
-            )
-            documents.append(doc)
+def build_caches_from_index(store):
+    """Recover the entity list and relationship cache from the metadata stored with the index"""
+    entities = []
+    relationships = {}
+
+    for doc_id in store.index_to_docstore_id.values():
+        doc = store.docstore.search(doc_id)
+        if not isinstance(doc, Document):
+            continue
+        name = doc.metadata.get("name")
+        if not name:
+            continue
+        if doc.metadata.get("type") == "entity":
+            entities.append({"name": name, "id": doc.metadata.get("id"), "aliases": doc.metadata.get("aliases") or []})
+        elif doc.metadata.get("type") == "relationship":
+            relationships[name.lower()] = {"type": name, "frequency": doc.metadata.get("frequency")}
+
+    return entities, relationships
+
+def warm_up():
+    """Load the FAISS index and prime the embedding model before serving traffic"""
+    global warm_up_error
+
+    if ready.is_set():
+        return
+
+    with warm_up_lock:
+        if ready.is_set():
+            return
 
-        for rel in relationships:
-            doc = Document(
-                page_content=f"Relationship: {rel['type']}",
-                metadata={"type": "relationship", "name": rel['type']}
-            )
-            documents.append(doc)
+        started = time.perf_counter()
+        try:
+            driver.verify_connectivity()
+            ensure_indexes()
+            if not vector_store:
+                initialize_vector_store()
+            # initialize_vector_store logs and swallows its own errors
+            if not vector_store:
+                raise RuntimeError("Vector store could not be initialized")
+            embeddings.embed_query("warm up")
+        except Exception as e:
+            warm_up_error = str(e)
+            print(f"Warm-up failed: {e}")
+            return
 
-        if documents:
-            vector_store = FAISS.from_documents(documents, embeddings)
-            print(f"Vector store initialized with {len(documents)} documents")
+        warm_up_error = None
+        ready.set()
+        print(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
 
-            vector_store.save_local(FAISS_INDEX_PATH)
-            print("FAISS index saved to disk.")
-        else:
-            print("No documents found to create vector store.")
 
-    except Exception as e:
-        print(f"Error initializing vector store: {e}")
+def warm_up_until_ready():
+    """Retry warm-up with exponential backoff, e.g. while Neo4j is still unreachable after a deploy"""
+    delay = 1
+    while True:
+        warm_up()
+        if ready.is_set():
+            return
+        print(f"Retrying warm-up in {delay}s")
+        time.sleep(delay)
+        delay = min(delay * 2, WARM_UP_RETRY_MAX_SECONDS)
 
 
 def get_all_entities():
@@ -94,19 +219,55 @@ def get_all_entities():
         result = session.run("""
             MATCH (n)
             WHERE n.name IS NOT NULL
-            RETURN n.name as name, elementId(n) as id, n
+            RETURN n.name as name, elementId(n) as id, coalesce(n.aliases, []) as aliases, n.description as description
         """)
         return [record.data() for record in result]
 
 def get_all_relationship_types():
-    """Get all relationship types from Neo4j"""
+    """Get the predicate vocabulary (RELATES.type) from Neo4j with usage counts"""
     with driver.session() as session:
         result = session.run("""
-            MATCH ()-[r]->()
-            RETURN DISTINCT type(r) as type
+            MATCH ()-[r:RELATES]->()
+            WHERE r.type IS NOT NULL
+            RETURN r.type as type, count(*) as frequency
+            ORDER BY frequency DESC
         """)
         return [record.data() for record in result]
 
+def ensure_indexes():
+    """Create the lookup indexes the retrieval queries rely on"""
+    with driver.session() as session:
+        session.run("CREATE INDEX entity_name IF NOT EXISTS FOR (n:Entity) ON (n.name)")
+        session.run("CREATE INDEX relates_type IF NOT EXISTS FOR ()-[r:RELATES]-() ON (r.type)")
+
+def predicate_stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def build_predicate_index(relationships: Dict) -> Dict[str, set]:
+    """Map stemmed predicate words to the predicates containing them"""
+    index = {}
+    for rel in relationships.values():
+        for word in re.findall(r"[a-z0-9]+", rel['type'].lower()):
+            if word not in STOPWORDS:
+                index.setdefault(predicate_stem(word), set()).add(rel['type'])
+    return index
+
+def find_matching_predicates(query: str, matched_entities: List[Dict]) -> List[str]:
+    """Predicates whose words appear in the question, e.g. "what launched X" -> "launched by" """
+    entity_words = set(re.findall(r"[a-z0-9]+", " ".join(e["matched"] for e in matched_entities).lower()))
+
+    predicates = set()
+    for word in re.findall(r"[a-z0-9]+", query.lower()):
+        if word in STOPWORDS or word in entity_words:
+            continue
+        predicates.update(predicate_index.get(predicate_stem(word), ()))
+
+    # Keep the most frequent predicates first
+    return sorted(predicates, key=lambda p: -(relationship_cache.get(p.lower(), {}).get('frequency') or 0))
+
 def extract_entities_from_query(query: str) -> List[str]:
     """Extract potential entities from user query using LLM"""
     prompt = f"""
@@ -117,8 +278,28 @@ Query: {query}
 
 Entities:"""
     
-    response = llm.invoke(prompt).content.strip()
-
+    try:
+        response = router.invoke("extract_entities", prompt, validate=lambda text: is_valid_entity_list(parse_entity_list(text)))
+    except LLMUnavailable as e:
+        print(f"LLM unavailable for entity extraction ({e}), falling back to name lookup")
+        return extract_entities_lexically(query)
+    return parse_entity_list(response)
+
+def extract_entities_lexically(query: str, max_words: int = 4) -> List[str]:
+    """Degraded extraction: word n-grams of the query that are known entity names"""
+    words = re.findall(r"[\w-]+", query)
+    found = []
+    for size in range(max_words, 0, -1):
+        for start in range(len(words) - size + 1):
+            mention = " ".join(words[start:start + size])
+            if size == 1 and mention.lower() in STOPWORDS:
+                continue
+            match = entity_index.lookup(mention)
+            if match and match["method"] != "trigram" and match["name"] not in found:
+                found.append(match["name"])
+    return found
+
+def parse_entity_list(response: str) -> List[str]:
     entities = []
     for entity in response.split(','):
         entity = entity.strip().strip('"').strip("'")
@@ -127,6 +308,10 @@ Entities:"""
     
     return entities
 
+def is_valid_entity_list(entities: List[str]) -> bool:
+    """Reject outputs that are empty or look like prose rather than a list of names"""
+    return bool(entities) and len(entities) <= 20 and all(len(entity) <= 80 for entity in entities)
+
 def find_matching_entities(extracted_entities: List[str]) -> List[Dict]:
     matched_entities = []
     
@@ -138,17 +323,30 @@ def find_matching_entities(extracted_entities: List[str]) -> List[Dict]:
                 "type": "entity",
                 "confidence": 1.0
             })
-        else:
-            search_results = semantic_search(entity, k=3)
-            for result in search_results:
-                if result["type"] == "entity":
-                    matched_entities.append({
-                        "original": entity,
-                        "matched": result["name"],
-                        "type": "entity",
-                        "confidence": 0.8
-                    })
-                    break
+            continue
+
+        lexical_match = entity_index.lookup(entity)
+        if lexical_match:
+            matched_entities.append({
+                "original": entity,
+                "matched": lexical_match["name"],
+                "type": "entity",
+                "confidence": lexical_match["score"]
+            })
+            continue
+
+        search_results = semantic_search(entity, k=3)
+        for result in search_results:
+            if result["type"] == "entity":
+                matched_entities.append({
+                    "original": entity,
+                    "matched": result["name"],
+                    "type": "entity",
+                    "confidence": result["score"]
+                })
+                if result["score"] >= ALIAS_LEARN_THRESHOLD:
+                    entity_index.add_alias(entity, result["name"], result["score"])
+                break
     
     return matched_entities
 
@@ -158,15 +356,16 @@ def semantic_search(query: str, k: int = 10) -> List[Dict]:
         return []
     
     try:
-        docs = vector_store.similarity_search(query, k=k)
+        docs = vector_store.similarity_search_with_relevance_scores(query, k=k)
         
         results = []
-        for doc in docs:
+        for doc, score in docs:
             results.append({
                 "content": doc.page_content,
                 "metadata": doc.metadata,
                 "type": doc.metadata.get("type"),
-                "name": doc.metadata.get("name")
+                "name": doc.metadata.get("name"),
+                "score": round(float(score), 3)
             })
         
         return results
@@ -174,23 +373,85 @@ def semantic_search(query: str, k: int = 10) -> List[Dict]:
         print(f"Error in semantic search: {e}")
         return []
 
-def execute_query_with_proper_fallback(query: str, matched_entities: List[Dict]) -> tuple:
+# Retrieval queries return only what the prompt needs, oriented along the stored edge
+ROW_PROJECTION = """
+    startNode(r).name AS subject, coalesce(r.type, type(r)) AS predicate, endNode(r).name AS object,
+    elementId(startNode(r)) AS subject_id, elementId(endNode(r)) AS object_id
+"""
+
+def rows_from_result(result) -> List[GraphRow]:
+    return [GraphRow.from_record(record) for record in result]
+
+def neighbor_to_row(neighbor: Dict) -> GraphRow:
+    """Shape a k-hop neighbor like a relationship row, oriented along the stored edge"""
+    via, reached = neighbor["via"], neighbor["name"]
+    subject, obj = (via, reached) if neighbor["outgoing"] else (reached, via)
+    return GraphRow(subject, neighbor["predicate"], obj, distance=neighbor["distance"])
+
+def resolve_lookup_entity(query: str):
+    """For "what is X"-style questions, resolve X to exactly one known entity"""
+    for pattern in LOOKUP_PATTERNS:
+        match = pattern.match(query.strip())
+        if not match:
+            continue
+
+        mention = match.group("entity")
+        if mention.lower() in entity_cache:
+            return {"original": mention, "matched": entity_cache[mention.lower()]['name'], "type": "entity", "confidence": 1.0}
+
+        lexical_match = entity_index.lookup(mention)
+        if lexical_match and lexical_match["score"] >= FACT_CARD_MIN_SCORE:
+            return {"original": mention, "matched": lexical_match["name"], "type": "entity", "confidence": lexical_match["score"]}
+    return None
+
+def get_fact_card(entity_name: str):
+    """Fetch the card precomputed by data/fact-cards.py, if any"""
+    with driver.session() as session:
+        record = session.run(
+            "MATCH (n:Entity {name: $name}) RETURN n.fact_card AS card",
+            name=entity_name
+        ).single()
+    return record["card"] if record else None
+
+def execute_query_with_proper_fallback(query: str, matched_entities: List[Dict], matched_predicates: List[str] = None, depth: int = 1) -> tuple:
     with driver.session() as session:
         
         if matched_entities:
             entity_name = matched_entities[0]["matched"]
             
-            relationship_query = f"""
-            MATCH (n)-[r]-(m) 
-            WHERE toLower(n.name) = toLower('{entity_name}') 
-            RETURN n, type(r) as relationship_type, m
-            """
-            
-            print(f"Executing relationship query: {relationship_query}")
-            
             try:
-                result = session.run(relationship_query)
-                data = [record.data() for record in result]
+                if matched_predicates:
+                    # Only traverse edges whose predicate the question asks about
+                    print(f"Executing predicate-filtered query for {entity_name}: {matched_predicates}")
+                    result = session.run(f"""
+                    MATCH (n:Entity {{name: $name}})-[r:RELATES]-(m) 
+                    WHERE r.type IN $predicates 
+                    RETURN {ROW_PROJECTION}
+                    ORDER BY coalesce(m.pagerank, 0) DESC
+                    """, name=entity_name, predicates=matched_predicates)
+                    data = rows_from_result(result)
+                    
+                    if data:
+                        print(f"Found {len(data)} {matched_predicates} relationships for {entity_name}")
+                        return data, "entity_relationships"
+                
+                if depth > 1:
+                    neighbors = k_hop_neighborhood(session, entity_name, depth)
+                    if neighbors:
+                        print(f"Found {len(neighbors)} entities within {depth} hops of {entity_name}")
+                        return [neighbor_to_row(neighbor) for neighbor in neighbors], "entity_relationships"
+                
+                relationship_query = f"""
+                MATCH (n)-[r]-(m) 
+                WHERE toLower(n.name) = toLower($name) 
+                RETURN {ROW_PROJECTION}
+                ORDER BY coalesce(m.pagerank, 0) DESC
+                """
+                
+                print(f"Executing relationship query for {entity_name}")
+                
+                result = session.run(relationship_query, name=entity_name)
+                data = rows_from_result(result)
                 
                 if data:
                     print(f"Found {len(data)} relationships for {entity_name}")
@@ -198,14 +459,14 @@ def execute_query_with_proper_fallback(query: str, matched_entities: List[Dict])
                 else:
                     print(f"No relationships found for {entity_name}, checking if entity exists...")
                     
-                    entity_query = f"""
+                    entity_query = """
                     MATCH (n) 
-                    WHERE toLower(n.name) = toLower('{entity_name}') 
-                    RETURN n
+                    WHERE toLower(n.name) = toLower($name) 
+                    RETURN n.name AS subject, elementId(n) AS subject_id
                     """
                     
-                    entity_result = session.run(entity_query)
-                    entity_data = [record.data() for record in entity_result]
+                    entity_result = session.run(entity_query, name=entity_name)
+                    entity_data = rows_from_result(entity_result)
                     
                     if entity_data:
                         print(f"Entity {entity_name} exists but has no relationships")
@@ -218,21 +479,55 @@ def execute_query_with_proper_fallback(query: str, matched_entities: List[Dict])
                 print(f"Error executing relationship query: {e}")
                 return get_all_relationships(session)
         
+        elif matched_predicates:
+            print(f"No matched entities found, returning {matched_predicates} relationships")
+            return get_predicate_relationships(session, matched_predicates)
+        
         else:
             print("No matched entities found, returning all relationships")
             return get_all_relationships(session)
 
+def get_predicate_relationships(session, predicates: List[str]):
+    try:
+        result = session.run(f"""
+        MATCH (n)-[r:RELATES]->(m) 
+        WHERE r.type IN $predicates 
+        RETURN {ROW_PROJECTION}
+        ORDER BY coalesce(n.pagerank, 0) + coalesce(m.pagerank, 0) DESC 
+        LIMIT 20
+        """, predicates=predicates)
+        data = rows_from_result(result)
+        
+        if data:
+            print(f"Found {len(data)} relationships for predicates {predicates}")
+            return data, "predicate_relationships"
+        return get_all_relationships(session)
+        
+    except Exception as e:
+        print(f"Error getting predicate relationships: {e}")
+        return get_all_relationships(session)
+
 def get_all_relationships(session):
     try:
-        all_relationships_query = """
+        # Most important facts first, using the scores stored by data/graph-analytics.py
+        ranked_relationships_query = f"""
+        MATCH (n:Entity) WHERE n.pagerank IS NOT NULL 
+        WITH n ORDER BY n.pagerank DESC LIMIT 20 
+        MATCH (n)-[r:RELATES]->(m) 
+        WITH n, r, m ORDER BY n.pagerank + coalesce(m.pagerank, 0) DESC LIMIT 20 
+        RETURN {ROW_PROJECTION}
+        """
+        all_relationships_query = f"""
         MATCH (n)-[r]->(m) 
-        RETURN n, type(r) as relationship_type, m 
+        RETURN {ROW_PROJECTION}
         LIMIT 20
         """
         
         print("Executing query for all relationships")
-        result = session.run(all_relationships_query)
-        data = [record.data() for record in result]
+        data = rows_from_result(session.run(ranked_relationships_query))
+        if not data:
+            result = session.run(all_relationships_query)
+            data = rows_from_result(result)
         
         if data:
             print(f"Found {len(data)} general relationships")
@@ -245,17 +540,13 @@ def get_all_relationships(session):
         print(f"Error getting all relationships: {e}")
         return [], "error"
 
-def generate_answer(question: str, graph_data: List[Dict], query_type: str) -> str:
+def generate_answer(question: str, graph_data: List[GraphRow], query_type: str, focus_entities: List[str] = None) -> str:
 
     if not graph_data:
         return "No data found in the knowledge graph."
 
-    limited_data = graph_data[:10]
-    
-    try:
-        graph_json = json.dumps(limited_data, indent=2, default=str)
-    except:
-        graph_json = str(limited_data)
+    graph_context, fact_count = build_graph_context(question, graph_data, boost_terms=focus_entities)
+    print(f"Packed {fact_count} facts into the answer prompt")
     
     if query_type == "entity_relationships":
         prompt = f"""
@@ -264,7 +555,7 @@ Based on the knowledge graph data below, answer the user's question directly and
 User's question: {question}
 
 Knowledge graph data:
-{graph_json}
+{graph_context}
 
 Instructions:
 - Answer based ONLY on the provided graph data
@@ -282,7 +573,7 @@ The entity from the user's question exists in the knowledge graph but has no rel
 User's question: {question}
 
 Entity data:
-{graph_json}
+{graph_context}
 
 Provide a brief response indicating that the entity exists but has no connections in the current knowledge graph.
 
@@ -295,7 +586,7 @@ The user asked about something not specifically found in the knowledge graph. He
 User's question: {question}
 
 Available relationships:
-{graph_json}
+{graph_context}
 
 Instructions:
 - Mention that the specific entity/concept wasn't found
@@ -311,16 +602,83 @@ Answer the user's question based on the available knowledge graph data:
 User's question: {question}
 
 Data:
-{graph_json}
+{graph_context}
 
 Answer:"""
     
+    if query_type == "entity_no_relationships":
+        task, complex_ = "answer_no_relationships", False
+    elif query_type == "all_relationships":
+        task, complex_ = "answer_overview", False
+    else:
+        task = "answer"
+        complex_ = is_complex_question(question, len(focus_entities or []), fact_count)
+    
     try:
-        response = llm.invoke(prompt).content.strip()
+        response = router.invoke(task, prompt, validate=bool, complex_=complex_)
         return response if response else "Unable to generate answer from the available data."
     except Exception as e:
-        print(f"Error generating answer: {e}")
+        print(f"Error generating answer ({type(e).__name__}: {e}), returning graph-only answer")
+        return degraded_answer(graph_context)
+
+def degraded_answer(graph_context: str) -> str:
+    """Answer with the top graph facts verbatim when the LLM is unavailable"""
+    facts = [line for line in graph_context.splitlines() if line][:DEGRADED_MAX_FACTS]
+    if not facts:
         return "Sorry, I encountered an error while generating the answer."
+    return (
+        "The language model is unavailable right now. Here is what the knowledge graph says:\n"
+        + "\n".join(f"- {fact}" for fact in facts)
+    )
+
+def answer_query(query: str, depth: int = 1) -> Dict:
+    warm_up()
+    
+    # All LLM calls for this question share one deadline
+    with deadline_scope(ASK_DEADLINE_SECONDS):
+        return run_pipeline(query, depth)
+
+def run_pipeline(query: str, depth: int) -> Dict:    
+    # Fast path: single-entity lookups are answered from the precomputed fact card
+    lookup_entity = resolve_lookup_entity(query) if depth == 1 else None
+    fact_card = get_fact_card(lookup_entity["matched"]) if lookup_entity else None
+    if fact_card:
+        print(f"Answering from fact card of {lookup_entity['matched']}")
+        return {
+            "answer": fact_card,
+            "debug": {
+                "extracted_entities": [lookup_entity["original"]],
+                "matched_entities": [lookup_entity],
+                "matched_predicates": [],
+                "query_type": "fact_card",
+                "result_count": 1
+            }
+        }
+    
+    extracted_entities = extract_entities_from_query(query)
+    print(f"Extracted entities: {extracted_entities}")
+    
+    matched_entities = find_matching_entities(extracted_entities)
+    print(f"Matched entities: {matched_entities}")
+    
+    matched_predicates = find_matching_predicates(query, matched_entities)
+    print(f"Matched predicates: {matched_predicates}")
+    
+    result, query_type = execute_query_with_proper_fallback(query, matched_entities, matched_predicates, depth)
+    
+    focus_entities = [entity["matched"] for entity in matched_entities]
+    final_answer = generate_answer(query, result, query_type, focus_entities)
+    
+    return {
+        "answer": final_answer,
+        "debug": {
+            "extracted_entities": extracted_entities,
+            "matched_entities": matched_entities,
+            "matched_predicates": matched_predicates,
+            "query_type": query_type,
+            "result_count": len(result)
+        }
+    }
 
 @app.route('/ask', methods=['POST'])
 def ask():
@@ -331,27 +689,20 @@ def ask():
         if not query:
             return jsonify({"error": "Query is required"}), 400
         
-        if not vector_store:
-            initialize_vector_store()
-        
-        extracted_entities = extract_entities_from_query(query)
-        print(f"Extracted entities: {extracted_entities}")
-        
-        matched_entities = find_matching_entities(extracted_entities)
-        print(f"Matched entities: {matched_entities}")
+        try:
+            depth = int(data.get('depth', 1))
+        except (TypeError, ValueError):
+            return jsonify({"error": "depth must be an integer"}), 400
+        depth = max(1, min(depth, MAX_ASK_DEPTH))
         
-        result, query_type = execute_query_with_proper_fallback(query, matched_entities)
-        
-        final_answer = generate_answer(query, result, query_type)
+        # Identical questions already in flight share the first request's answer
+        response, coalesced = inflight_queries.do(
+            (normalize_query(query), depth), lambda: answer_query(query, depth)
+        )
         
         return jsonify({
-            "answer": final_answer,
-            "debug": {
-                "extracted_entities": extracted_entities,
-                "matched_entities": matched_entities,
-                "query_type": query_type,
-                "result_count": len(result)
-            }
+            "answer": response["answer"],
+            "debug": {**response["debug"], "coalesced": coalesced}
         })
             
     except Exception as e:
@@ -359,14 +710,125 @@ def ask():
         traceback.print_exc()
         return jsonify({"error": f"Error processing query: {str(e)}"}), 500
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    if not ready.is_set():
+        return jsonify({"status": "warming_up", "error": warm_up_error}), 503
+    return jsonify({"status": "ready", "vector_store_loaded": vector_store is not None})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        "embeddings": embeddings.stats(),
+        "ask_coalescing": inflight_queries.stats(),
+        "llm": router.stats(),
+        "graph_cache": graph_cache.stats(),
+    })
+
+def int_arg(name: str, default: int, low: int, high: int) -> int:
+    value = int(request.args.get(name, default))
+    return max(low, min(value, high))
+
+def bad_int_args():
+    return jsonify({"error": "limit, offset and depth must be integers"}), 400
+
+def graph_response(compute):
+    """Compact JSON with an ETag; unchanged views come back as 304 Not Modified"""
+    key = (request.path, tuple(sorted(request.args.items())))
+    try:
+        body = graph_cache.get_or_compute(key, lambda: compact_json(compute()))
+    except Exception as e:
+        return jsonify({"error": f"Error reading graph: {str(e)}"}), 500
+
+    response = app.response_class(body, mimetype="application/json")
+    response.add_etag()
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+@app.route('/graph/seed', methods=['GET'])
+def graph_seed():
+    try:
+        limit = int_arg('limit', GRAPH_SEED_LIMIT, 1, GRAPH_MAX_NODES)
+    except ValueError:
+        return bad_int_args()
+
+    def compute():
+        with driver.session() as session:
+            return seed_subgraph(session, limit, request.args.get('entity', '').strip() or None)
+    return graph_response(compute)
+
+@app.route('/graph/expand', methods=['GET'])
+def graph_expand():
+    node = request.args.get('node', '').strip()
+    if not node:
+        return jsonify({"error": "node is required"}), 400
+
+    try:
+        offset = int_arg('offset', 0, 0, 10**9)
+        limit = int_arg('limit', GRAPH_EXPAND_LIMIT, 1, GRAPH_MAX_NODES)
+    except ValueError:
+        return bad_int_args()
+
+    def compute():
+        with driver.session() as session:
+            return expand_node(session, node, offset, limit)
+    return graph_response(compute)
+
+@app.route('/graph/layout', methods=['GET'])
+def graph_layout():
+    """Precomputed coordinates written by data/graph-maker.py, so clients can render with physics off"""
+    if not os.path.exists(LAYOUT_PATH):
+        return jsonify({"error": "No layout exported yet; run data/graph-maker.py"}), 404
+
+    if 'gzip' in request.accept_encodings:
+        # The file is already gzip-compressed JSON; send it as-is
+        response = send_file(LAYOUT_PATH, mimetype="application/json", conditional=True, max_age=0)
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+    else:
+        with gzip.open(LAYOUT_PATH, "rb") as f:
+            response = app.response_class(f.read(), mimetype="application/json")
+        response.add_etag()
+        response = response.make_conditional(request)
+
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/graph/viewport', methods=['GET'])
+def graph_viewport():
+    center = request.args.get('center', '').strip()
+    if not center:
+        return jsonify({"error": "center is required"}), 400
+
+    try:
+        depth = int_arg('depth', 2, 1, MAX_ASK_DEPTH)
+        limit = int_arg('limit', GRAPH_VIEWPORT_LIMIT, 1, GRAPH_MAX_NODES)
+    except ValueError:
+        return bad_int_args()
+
+    def compute():
+        with driver.session() as session:
+            return viewport_subgraph(session, center, depth, limit)
+    return graph_response(compute)
+
 @app.route('/refresh-vector-store', methods=['POST'])
 def refresh_vector_store():
     try:
         initialize_vector_store(force_rebuild=True)
+        graph_cache.clear()
         return jsonify({"message": "Vector store refreshed and saved successfully"})
     except Exception as e:
         return jsonify({"error": f"Error refreshing vector store: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    initialize_vector_store()
-    app.run(debug=True)
\ No newline at end of file
+    warm_up()
+    if not ready.is_set():
+        threading.Thread(target=warm_up_until_ready, daemon=True).start()
+    app.run(debug=True)
+else:
+    # Under a WSGI server, warm up in the background; /readyz reports 503 until done
+    threading.Thread(target=warm_up_until_ready, daemon=True).start()
\ No newline at end of file
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+from page_dedup import BOILERPLATE_MIN_CHARS, PageDeduplicator, block_key
+
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", "crawl_state.sqlite3")
+
+# Recrawl intervals adapt per page: halved when the page changed, doubled when it did not
+RECRAWL_INITIAL_INTERVAL = float(os.getenv("RECRAWL_INITIAL_HOURS", "24")) * 3600
+RECRAWL_MIN_INTERVAL = 3600
+RECRAWL_MAX_INTERVAL = 30 * 24 * 3600
+
+# Statuses whose SimHash was added to the deduplicator when the page was processed
+FINGERPRINTED_STATUSES = ("new", "reduced", "empty")
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class CrawlState:
+    """SQLite checkpoint of a crawl: frontier, visited pages and fetch metadata.
+
+    Every URL ever discovered has one row in `pages`. Rows with status
+    'queued' form the frontier in discovery order (rowid); every other row is
+    a visited page with its content hash, SimHash and recrawl schedule. Each
+    page is committed as soon as it is processed, so a crash loses at most the
+    page being fetched.
+    """
+    def __init__(self, path: str = CRAWL_STATE_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    content_hash TEXT,
+                    simhash TEXT,
+                    fetches INTEGER NOT NULL DEFAULT 0,
+                    changes INTEGER NOT NULL DEFAULT 0,
+                    fetched_at REAL,
+                    recrawl_interval REAL,
+                    next_fetch_at REAL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS pages_status ON pages(status)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS pages_next_fetch ON pages(next_fetch_at)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS blocks (key BLOB PRIMARY KEY, url TEXT)")
+            # Checkpoints written before blocks were keyed by page keep NULL sources
+            if "url" not in {row[1] for row in self.conn.execute("PRAGMA table_info(blocks)")}:
+                self.conn.execute("ALTER TABLE blocks ADD COLUMN url TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS blocks_url ON blocks(url)")
+
+    def close(self):
+        self.conn.close()
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall()
+        return dict(rows)
+
+    def enqueue(self, urls: Iterable[str]):
+        """Add newly discovered URLs to the frontier; known URLs are ignored"""
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO pages (url) VALUES (?)", ((url,) for url in urls))
+
+    def next_queued(self, limit: int = 1) -> List[str]:
+        """Oldest frontier URLs; they stay queued until record_fetch checkpoints them"""
+        rows = self.conn.execute("SELECT url FROM pages WHERE status = 'queued' ORDER BY rowid LIMIT ?", (limit,))
+        return [row[0] for row in rows]
+
+    def due_pages(self, now: float = None, limit: int = None) -> List[str]:
+        """Visited pages whose next recrawl time has passed, most overdue first"""
+        query = "SELECT url FROM pages WHERE status != 'queued' AND next_fetch_at <= ? ORDER BY next_fetch_at"
+        params = [now or time.time()]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def previous_hash(self, url: str) -> Optional[str]:
+        row = self.conn.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def load_dedup(self, dedup: PageDeduplicator):
+        """Restore boilerplate blocks and page fingerprints from earlier runs"""
+        for key, url in self.conn.execute("SELECT key, url FROM blocks"):
+            dedup.add_block(key, url)
+        placeholders = ",".join("?" * len(FINGERPRINTED_STATUSES))
+        for url, fingerprint in self.conn.execute(
+            f"SELECT url, simhash FROM pages WHERE simhash IS NOT NULL AND status IN ({placeholders})",
+            FINGERPRINTED_STATUSES,
+        ):
+            dedup.add_fingerprint(int(fingerprint, 16), url)
+
+    def record_fetch(self, url: str, status: str, page_hash: str = None, fingerprint: int = None,
+                     saved_text: str = None):
+        """Checkpoint one processed page and schedule its next recrawl.
+
+        `saved_text` replaces the page's boilerplate blocks; None (failed or unchanged fetch) keeps them.
+        """
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT content_hash, recrawl_interval FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        old_hash, interval = row if row else (None, None)
+        interval = interval or RECRAWL_INITIAL_INTERVAL
+
+        changed = 0
+        if page_hash is None:
+            # Failed fetch: keep what we knew and retry soon
+            page_hash, interval = old_hash, RECRAWL_MIN_INTERVAL
+        elif old_hash is None:
+            pass
+        elif page_hash != old_hash:
+            changed = 1
+            interval = max(RECRAWL_MIN_INTERVAL, interval / 2)
+        else:
+            interval = min(RECRAWL_MAX_INTERVAL, interval * 2)
+
+        keys = [
+            (block_key(block), url)
+            for block in (saved_text or "").split("\n")
+            if len(block.strip()) >= BOILERPLATE_MIN_CHARS
+        ]
+
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO pages (url) VALUES (?)", (url,))
+            self.conn.execute("""
+                UPDATE pages
+                SET status = ?,
+                    content_hash = ?,
+                    simhash = coalesce(?, simhash),
+                    fetches = fetches + 1,
+                    changes = changes + ?,
+                    fetched_at = ?,
+                    recrawl_interval = ?,
+                    next_fetch_at = ?
+                WHERE url = ?
+            """, (
+                status,
+                page_hash,
+                format(fingerprint, "016x") if fingerprint is not None else None,
+                changed,
+                now,
+                interval,
+                now + interval,
+                url,
+            ))
+            if saved_text is not None:
+                self.conn.execute("DELETE FROM blocks WHERE url = ?", (url,))
+                self.conn.executemany("INSERT OR IGNORE INTO blocks (key, url) VALUES (?, ?)", keys)
+
+    def record_unchanged(self, url: str):
+        """A recrawl found identical content; back off without touching the dedup state"""
+        row = self.conn.execute("SELECT status, content_hash, simhash FROM pages WHERE url = ?", (url,)).fetchone()
+        self.record_fetch(url, row[0], row[1], int(row[2], 16) if row[2] else None)
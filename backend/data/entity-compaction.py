@@ -0,0 +1,200 @@
+from neo4j import GraphDatabase
+from sentence_transformers import SentenceTransformer
+from collections import defaultdict
+import json
+import os
+import re
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from triplet_normalizer import canonical_key
+
+URI = os.getenv("NEO4J_URI")
+USERNAME = os.getenv("NEO4J_USERNAME")
+PASSWORD = os.getenv("NEO4J_PASSWORD")
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:5000")
+
+# Dry run unless COMPACTION_APPLY=true
+COMPACTION_APPLY = os.getenv("COMPACTION_APPLY", "").lower() == "true"
+COMPACTION_MIN_SIMILARITY = float(os.getenv("COMPACTION_MIN_SIMILARITY", "0.92"))
+COMPACTION_MAX_BLOCK = 200
+MERGE_BATCH_SIZE = 50
+REPORT_PATH = "compaction_report.json"
+
+driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
+
+def load_entities():
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (n:Entity)
+            RETURN elementId(n) AS id, n.name AS name, coalesce(n.aliases, []) AS aliases,
+                   COUNT { (n)--() } AS degree
+        """)
+        return [record.data() for record in result if record["name"]]
+
+def blocking_key(name):
+    # Ignore a trailing "(ABBR)" so "Space Applications Centre (SAC)" blocks with "Space Applications Centre"
+    return canonical_key(re.sub(r"\([^)]*\)\s*$", "", name))
+
+def identifying_tokens(name):
+    """Tokens with a digit ("3d", "3dr", "2"): names differing in these are different satellites, not spellings"""
+    return frozenset(token for token in canonical_key(name).split() if any(c.isdigit() for c in token))
+
+def find_duplicate_clusters(entities, model):
+    """Identical normalized names always merge; names sharing a first token merge into a
+    seed name when their embeddings have cosine similarity of at least COMPACTION_MIN_SIMILARITY.
+
+    Names whose numeric/alphanumeric tokens differ never merge, and every cluster member
+    must be similar to the seed itself, so similarity cannot chain A~B~C into one cluster.
+    """
+    reasons = {}
+
+    # Grouped on the identifying tokens too, since blocking_key drops a trailing "(INSAT-3D)"
+    groups = defaultdict(list)
+    for entity in entities:
+        key = blocking_key(entity["name"])
+        if key:
+            groups[(key, identifying_tokens(entity["name"]))].append(entity)
+    for members in groups.values():
+        for entity in members[1:]:
+            reasons[entity["id"]] = "normalized_name"
+
+    blocks = defaultdict(list)
+    for key, tokens in groups:
+        blocks[key.split()[0]].append((key, tokens))
+
+    clusters = []
+    for block in blocks.values():
+        if len(block) < 2 or len(block) > COMPACTION_MAX_BLOCK:
+            clusters.extend([groups[key]] for key in block)
+            continue
+        # Best-connected names seed clusters first
+        block.sort(key=lambda key: -sum(e["degree"] for e in groups[key]))
+        names = [max(groups[key], key=lambda e: e["degree"])["name"] for key in block]
+        vectors = model.encode(names, normalize_embeddings=True)
+        similarity = vectors @ vectors.T
+
+        assigned = set()
+        for i in range(len(block)):
+            if i in assigned:
+                continue
+            assigned.add(i)
+            cluster = [groups[block[i]]]
+            for j in range(i + 1, len(block)):
+                if j in assigned or block[j][1] != block[i][1] or similarity[i, j] < COMPACTION_MIN_SIMILARITY:
+                    continue
+                assigned.add(j)
+                cluster.append(groups[block[j]])
+                for entity in groups[block[j]]:
+                    reasons.setdefault(entity["id"], f"embedding:{similarity[i, j]:.3f} to {names[i]}")
+            clusters.append(cluster)
+
+    merges = []
+    for cluster in clusters:
+        members = [entity for group in cluster for entity in group]
+        if len(members) < 2:
+            continue
+        # Keep the best-connected spelling; the others become its aliases
+        keep = max(members, key=lambda e: (e["degree"], -len(e["name"])))
+        merges.append({
+            "keep": keep,
+            "duplicates": [e for e in members if e["id"] != keep["id"]],
+        })
+
+    return merges, reasons
+
+def merge_cluster(tx, keep, duplicates):
+    for dup in duplicates:
+        tx.run("""
+            MATCH (dup:Entity) WHERE elementId(dup) = $dup
+            MATCH (keep:Entity) WHERE elementId(keep) = $keep
+            MATCH (dup)-[r:RELATES]->(o:Entity)
+            WHERE o <> keep AND o <> dup AND r.type IS NOT NULL
+            MERGE (keep)-[:RELATES {type: r.type}]->(o)
+        """, dup=dup["id"], keep=keep["id"])
+        tx.run("""
+            MATCH (dup:Entity) WHERE elementId(dup) = $dup
+            MATCH (keep:Entity) WHERE elementId(keep) = $keep
+            MATCH (s:Entity)-[r:RELATES]->(dup)
+            WHERE s <> keep AND s <> dup AND r.type IS NOT NULL
+            MERGE (s)-[:RELATES {type: r.type}]->(keep)
+        """, dup=dup["id"], keep=keep["id"])
+        tx.run("MATCH (dup:Entity) WHERE elementId(dup) = $dup DETACH DELETE dup", dup=dup["id"])
+
+    aliases = sorted(
+        ({name for e in duplicates for name in [e["name"], *e["aliases"]]} | set(keep["aliases"])) - {keep["name"]}
+    )
+
+    # Collapse parallel edges with the same predicate left over from earlier ingests
+    tx.run("""
+        MATCH (keep:Entity) WHERE elementId(keep) = $keep
+        SET keep.aliases = $aliases
+        WITH keep
+        MATCH (keep)-[r:RELATES]-()
+        WITH startNode(r) AS a, endNode(r) AS b, r.type AS type, collect(r) AS rels
+        WHERE size(rels) > 1
+        FOREACH (extra IN tail(rels) | DELETE extra)
+    """, keep=keep["id"], aliases=aliases)
+
+def apply_merges(merges):
+    with driver.session() as session:
+        for start in range(0, len(merges), MERGE_BATCH_SIZE):
+            batch = merges[start:start + MERGE_BATCH_SIZE]
+
+            def merge_batch(tx):
+                for merge in batch:
+                    merge_cluster(tx, merge["keep"], merge["duplicates"])
+
+            session.execute_write(merge_batch)
+            print(f"🔧 Merged clusters {start + 1}-{start + len(batch)} of {len(merges)}")
+
+def write_report(merges, reasons):
+    report = [
+        {
+            "keep": merge["keep"]["name"],
+            "keep_degree": merge["keep"]["degree"],
+            "merge": [
+                {
+                    "name": dup["name"],
+                    "degree": dup["degree"],
+                    "reason": reasons.get(dup["id"], "seed"),
+                }
+                for dup in merge["duplicates"]
+            ],
+        }
+        for merge in merges
+    ]
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    removed = sum(len(merge["duplicates"]) for merge in merges)
+    print(f"📝 {len(merges)} duplicate clusters, {removed} nodes to remove. Report: {REPORT_PATH}")
+    for entry in report[:20]:
+        print(f"  • {entry['keep']} ⟵ {', '.join(m['name'] for m in entry['merge'])}")
+
+def refresh_vector_index():
+    try:
+        res = requests.post(f"{BACKEND_URL}/refresh-vector-store", timeout=600)
+        print(f"🔄 Vector index refresh: {res.status_code} {res.text.strip()}")
+    except Exception as e:
+        print(f"❌ Could not refresh the vector index at {BACKEND_URL}: {e}")
+
+
+if __name__ == "__main__":
+    try:
+        entities = load_entities()
+        print(f"Loaded {len(entities)} entities")
+
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+        merges, reasons = find_duplicate_clusters(entities, model)
+        write_report(merges, reasons)
+
+        if not COMPACTION_APPLY:
+            print("Dry run only. Set COMPACTION_APPLY=true to merge.")
+        elif merges:
+            apply_merges(merges)
+            refresh_vector_index()
+    finally:
+        driver.close()
@@ -0,0 +1,101 @@
+from neo4j import GraphDatabase
+import hashlib
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+URI = os.getenv("NEO4J_URI")
+USERNAME = os.getenv("NEO4J_USERNAME")
+PASSWORD = os.getenv("NEO4J_PASSWORD")
+
+FACT_CARD_MAX_SENTENCES = int(os.getenv("FACT_CARD_MAX_SENTENCES", "8"))
+FACT_CARD_MAX_OBJECTS = 5
+WRITE_BATCH_SIZE = 500
+
+driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
+
+def neighborhood_hash(facts):
+    """Fingerprint of an entity's edges; the card is regenerated only when it changes"""
+    keys = sorted(f"{f['outgoing']}|{f['predicate']}|{f['other']}" for f in facts)
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+def build_card(name, facts):
+    """Compact sentences grouped by predicate, most important neighbors first"""
+    groups = {}
+    for fact in sorted(facts, key=lambda f: -f["rank"]):
+        key = (fact["predicate"], fact["outgoing"])
+        groups.setdefault(key, []).append(fact["other"])
+
+    # Largest groups first: they describe the entity best
+    sentences = []
+    for (predicate, outgoing), others in sorted(groups.items(), key=lambda item: -len(item[1])):
+        listed = ", ".join(dict.fromkeys(others[:FACT_CARD_MAX_OBJECTS]))
+        if len(others) > FACT_CARD_MAX_OBJECTS:
+            listed += f" and {len(others) - FACT_CARD_MAX_OBJECTS} more"
+        sentences.append(f"{name} {predicate} {listed}." if outgoing else f"{listed} {predicate} {name}.")
+        if len(sentences) >= FACT_CARD_MAX_SENTENCES:
+            break
+
+    return " ".join(sentences)
+
+def generate_fact_cards(force=False):
+    started = time.perf_counter()
+    updates = []
+    checked = 0
+
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (n:Entity)-[r:RELATES]-(m:Entity)
+            WITH n, collect({
+                predicate: r.type,
+                other: m.name,
+                outgoing: startNode(r) = n,
+                rank: coalesce(m.pagerank, 0.0)
+            }) AS facts
+            RETURN elementId(n) AS id, n.name AS name, n.fact_card_hash AS card_hash, facts
+        """)
+
+        for record in result:
+            checked += 1
+            card_hash = neighborhood_hash(record["facts"])
+            if not force and card_hash == record["card_hash"]:
+                continue
+            updates.append({
+                "id": record["id"],
+                "card": build_card(record["name"], record["facts"]),
+                "hash": card_hash,
+            })
+
+    with driver.session() as session:
+        for start in range(0, len(updates), WRITE_BATCH_SIZE):
+            session.run("""
+                UNWIND $rows AS row
+                MATCH (n:Entity) WHERE elementId(n) = row.id
+                SET n.fact_card = row.card,
+                    n.fact_card_hash = row.hash,
+                    n.fact_card_updated_at = datetime()
+            """, rows=updates[start:start + WRITE_BATCH_SIZE])
+
+    cleared = clear_isolated_cards()
+    print(f"🗂️ Checked {checked} entities, regenerated {len(updates)} fact cards, cleared {cleared} stale "
+          f"in {time.perf_counter() - started:.1f}s")
+
+def clear_isolated_cards():
+    """Drop cards of entities that lost their last edge (e.g. merged away by compaction)"""
+    with driver.session() as session:
+        record = session.run("""
+            MATCH (n:Entity)
+            WHERE n.fact_card IS NOT NULL AND NOT (n)-[:RELATES]-(:Entity)
+            REMOVE n.fact_card, n.fact_card_hash, n.fact_card_updated_at
+            RETURN count(n) AS cleared
+        """).single()
+    return record["cleared"]
+
+
+if __name__ == "__main__":
+    try:
+        generate_fact_cards(force=os.getenv("FACT_CARDS_FORCE", "").lower() == "true")
+    finally:
+        driver.close()
@@ -0,0 +1,96 @@
+from neo4j import GraphDatabase
+from collections import Counter
+import networkx as nx
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+URI = os.getenv("NEO4J_URI")
+USERNAME = os.getenv("NEO4J_USERNAME")
+PASSWORD = os.getenv("NEO4J_PASSWORD")
+
+# Re-run every N minutes when set; otherwise compute once and exit
+ANALYTICS_INTERVAL_MINUTES = float(os.getenv("ANALYTICS_INTERVAL_MINUTES", "0"))
+WRITE_BATCH_SIZE = 1000
+
+driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
+
+def load_graph():
+    with driver.session() as session:
+        node_ids = [record["id"] for record in session.run("MATCH (n:Entity) RETURN elementId(n) AS id")]
+        edges = [
+            (record["source"], record["target"])
+            for record in session.run("""
+                MATCH (s:Entity)-[:RELATES]->(o:Entity)
+                RETURN elementId(s) AS source, elementId(o) AS target
+            """)
+        ]
+    return node_ids, edges
+
+def compute_scores(node_ids, edges):
+    """Degree, PageRank and Louvain community for every entity"""
+    degree = Counter()
+    for source, target in edges:
+        degree[source] += 1
+        degree[target] += 1
+
+    graph = nx.DiGraph()
+    graph.add_nodes_from(node_ids)
+    graph.add_edges_from(edges)
+
+    pagerank = nx.pagerank(graph) if graph.number_of_nodes() else {}
+
+    communities = nx.community.louvain_communities(graph.to_undirected(), seed=42)
+    community = {}
+    # Community 0 is the largest
+    for community_id, members in enumerate(sorted(communities, key=len, reverse=True)):
+        for node_id in members:
+            community[node_id] = community_id
+
+    return [
+        {
+            "id": node_id,
+            "degree": degree[node_id],
+            "pagerank": pagerank.get(node_id, 0.0),
+            "community": community.get(node_id),
+        }
+        for node_id in node_ids
+    ]
+
+def write_scores(rows):
+    with driver.session() as session:
+        session.run("CREATE INDEX entity_pagerank IF NOT EXISTS FOR (n:Entity) ON (n.pagerank)")
+        session.run("CREATE INDEX entity_degree IF NOT EXISTS FOR (n:Entity) ON (n.degree)")
+
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            session.run("""
+                UNWIND $rows AS row
+                MATCH (n:Entity) WHERE elementId(n) = row.id
+                SET n.degree = row.degree,
+                    n.pagerank = row.pagerank,
+                    n.community = row.community,
+                    n.analytics_updated_at = datetime()
+            """, rows=rows[start:start + WRITE_BATCH_SIZE])
+
+def run_analytics():
+    started = time.perf_counter()
+
+    node_ids, edges = load_graph()
+    rows = compute_scores(node_ids, edges)
+    write_scores(rows)
+
+    community_count = len({row["community"] for row in rows if row["community"] is not None})
+    print(f"📊 Scored {len(rows)} entities ({len(edges)} relationships, {community_count} communities) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    try:
+        run_analytics()
+        while ANALYTICS_INTERVAL_MINUTES > 0:
+            time.sleep(ANALYTICS_INTERVAL_MINUTES * 60)
+            run_analytics()
+    finally:
+        driver.close()
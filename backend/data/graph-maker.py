@@ -2,10 +2,13 @@ from neo4j import GraphDatabase
 import networkx as nx
 from pyvis.network import Network
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from graph_layout import compute_layout, export_layout, graph_hash, load_layout, LAYOUT_PATH
+
 URI = os.getenv("NEO4J_URI")
 USERNAME = os.getenv("NEO4J_USERNAME")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
@@ -14,28 +17,78 @@ driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
 
 def build_graph():
     def run_query(tx):
-        result = tx.run("MATCH (n)-[r]->(m) RETURN n.name AS source, type(r) AS rel, m.name AS target")
+        result = tx.run("MATCH (n)-[r]->(m) RETURN n.name AS source, coalesce(r.type, type(r)) AS rel, m.name AS target")
         G = nx.DiGraph()
         for record in result:
             G.add_edge(record["source"], record["target"], label=record["rel"])
+
+        # Communities materialized by graph-analytics.py, when it has run
+        result = tx.run("MATCH (n:Entity) WHERE n.community IS NOT NULL RETURN n.name AS name, n.community AS community")
+        for record in result:
+            if record["name"] in G:
+                G.nodes[record["name"]]["community"] = record["community"]
         return G
 
     with driver.session() as session:
-        graph = session.read_transaction(run_query)
+        graph = session.execute_read(run_query)
     return graph
 
-def save_graph_as_html(graph, output_path="neo4j_graph.html"):
+def communities_for(graph, names):
+    if all("community" in graph.nodes[name] for name in names):
+        return [graph.nodes[name]["community"] for name in names]
+
+    community = {}
+    for i, members in enumerate(nx.community.louvain_communities(graph.to_undirected(), seed=42)):
+        for name in members:
+            community[name] = i
+    return [community.get(name) for name in names]
+
+def update_layout(graph, path=LAYOUT_PATH, force=False):
+    """Recompute the layout only when the graph changed, keeping existing nodes where they were"""
+    names = sorted(graph.nodes)
+    edges = sorted((s, t, data.get("label", "")) for s, t, data in graph.edges(data=True))
+
+    previous = None if force else load_layout(path)
+    if previous and previous["graph_hash"] == graph_hash(names, edges):
+        print(f"✅ Layout is current ({len(names)} nodes): {path}")
+        return previous
+
+    started = time.perf_counter()
+    pos, placed = compute_layout(names, edges, previous)
+    layout = export_layout(names, edges, pos, communities_for(graph, names),
+                           [graph.degree(name) for name in names], path)
+    mode = "incremental" if previous else "full"
+    print(f"📐 {mode} layout: {len(names)} nodes ({placed} placed), {len(edges)} edges "
+          f"in {time.perf_counter() - started:.1f}s -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    return layout
+
+def save_graph_as_html(graph, output_path="neo4j_graph.html", layout=None):
     net = Network(notebook=False, directed=True)
     net.from_nx(graph)
 
+    positions = {}
+    if layout:
+        nodes = layout["nodes"]
+        positions = {name: (x, y) for name, x, y in zip(nodes["name"], nodes["x"], nodes["y"])}
+
     for node in net.nodes:
         node["color"] = "#c27aff"
         node["font"] = {"color": "#ffffff"}
+        if node["id"] in positions:
+            node["x"], node["y"] = positions[node["id"]]
+
+    # Coordinates are precomputed, so the browser only draws
+    if positions:
+        net.toggle_physics(False)
 
     net.save_graph(output_path)
     print(f"Graph saved to: {output_path}")
 
 
 if __name__ == "__main__":
-    graph = build_graph()
-    save_graph_as_html(graph, "neo4j_graph.html")
\ No newline at end of file
+    try:
+        graph = build_graph()
+        layout = update_layout(graph, force=os.getenv("LAYOUT_FORCE", "").lower() == "true")
+        save_graph_as_html(graph, "neo4j_graph.html", layout)
+    finally:
+        driver.close()
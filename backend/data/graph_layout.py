@@ -0,0 +1,198 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+LAYOUT_PATH = os.getenv("GRAPH_LAYOUT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph_layout.json.gz"))
+LAYOUT_ITERATIONS = int(os.getenv("LAYOUT_ITERATIONS", "200"))
+LAYOUT_INCREMENTAL_ITERATIONS = 60
+# Above this many nodes repulsion is approximated through a grid of cell centroids
+LAYOUT_EXACT_MAX_NODES = 3000
+LAYOUT_GRID_SIZE = 32
+REPULSION_CHUNK = 512
+# Exported coordinates are integers in [-LAYOUT_SCALE, LAYOUT_SCALE]
+LAYOUT_SCALE = 1000
+
+def _weighted_repulsion(pos: np.ndarray, others: np.ndarray, weights: np.ndarray, k: float,
+                        skip_self: bool = False) -> np.ndarray:
+    """sum_j w_j k² (p_i - p_j) / |p_i - p_j|², in row chunks so memory stays O(chunk × m).
+
+    Expanded as p_i·Σ_j c_ij - Σ_j c_ij p_j, so each chunk is two matrix products
+    instead of an (chunk × m × 2) tensor.
+    """
+    disp = np.empty_like(pos)
+    for start in range(0, len(pos), REPULSION_CHUNK):
+        chunk = pos[start:start + REPULSION_CHUNK]
+        dx = chunk[:, 0, None] - others[None, :, 0]
+        dy = chunk[:, 1, None] - others[None, :, 1]
+        coeff = weights * (k * k) / np.maximum(dx * dx + dy * dy, 1e-6)
+        if skip_self:
+            rows = np.arange(len(chunk))
+            coeff[rows, start + rows] = 0.0
+        disp[start:start + REPULSION_CHUNK] = chunk * coeff.sum(axis=1)[:, None] - coeff @ others
+    return disp
+
+def _exact_repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    """All-pairs k²/d repulsion"""
+    return _weighted_repulsion(pos, pos, np.ones(len(pos)), k, skip_self=True)
+
+def _grid_repulsion(pos: np.ndarray, k: float, grid: int = LAYOUT_GRID_SIZE) -> np.ndarray:
+    """Repulsion from cell centroids weighted by cell population (O(n × cells))"""
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-9)
+    cells = np.minimum((((pos - low) / span) * grid).astype(int), grid - 1)
+    cell_id = cells[:, 0] * grid + cells[:, 1]
+
+    counts = np.bincount(cell_id, minlength=grid * grid).astype(float)
+    sums = np.stack([np.bincount(cell_id, weights=pos[:, d], minlength=grid * grid) for d in range(2)], axis=1)
+    occupied = counts > 0
+    disp = _weighted_repulsion(pos, sums[occupied] / counts[occupied, None], counts[occupied], k)
+
+    # A node's own cell pulled its centroid toward it; swap that term for the centroid of its cell-mates
+    own_count = counts[cell_id]
+    own_centroid = sums[cell_id] / own_count[:, None]
+    delta = pos - own_centroid
+    disp -= delta * (own_count * k * k / np.maximum((delta ** 2).sum(axis=1), 1e-6))[:, None]
+    mates = own_count > 1
+    mate_centroid = (sums[cell_id[mates]] - pos[mates]) / (own_count[mates, None] - 1)
+    delta = pos[mates] - mate_centroid
+    disp[mates] += delta * ((own_count[mates] - 1) * k * k / np.maximum((delta ** 2).sum(axis=1), 1e-6))[:, None]
+    return disp
+
+def force_layout(n: int, sources: np.ndarray, targets: np.ndarray, initial: Optional[np.ndarray] = None,
+                 mobility: Optional[np.ndarray] = None, iterations: int = LAYOUT_ITERATIONS,
+                 temperature: float = 0.1, seed: int = 42) -> np.ndarray:
+    """Fruchterman-Reingold in the unit square, vectorized with NumPy.
+
+    `mobility` scales each node's step (1 = free, small = nearly pinned), which
+    lets an incremental update settle new nodes without reshuffling old ones.
+    """
+    rng = np.random.default_rng(seed)
+    pos = initial.copy() if initial is not None else rng.random((n, 2))
+    if n < 2:
+        return pos
+    mobility = np.ones(n) if mobility is None else mobility
+
+    k = 1.0 / np.sqrt(n)
+    repulsion = _exact_repulsion if n <= LAYOUT_EXACT_MAX_NODES else _grid_repulsion
+    step = temperature
+
+    for _ in range(iterations):
+        disp = repulsion(pos, k)
+
+        delta = pos[sources] - pos[targets]
+        dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1e-6)
+        pull = delta * (dist / k)[:, None]
+        for d in range(2):
+            disp[:, d] -= np.bincount(sources, weights=pull[:, d], minlength=n)
+            disp[:, d] += np.bincount(targets, weights=pull[:, d], minlength=n)
+
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        pos += disp / length[:, None] * np.minimum(length, step)[:, None] * mobility[:, None]
+        step -= temperature / (iterations + 1)
+
+    return pos
+
+def graph_hash(names: List[str], edges: List[Tuple[str, str, str]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(names):
+        digest.update(name.encode("utf-8") + b"\x1e")
+    for edge in sorted(edges):
+        digest.update("\x1f".join(edge).encode("utf-8") + b"\x1e")
+    return digest.hexdigest()
+
+def load_layout(path: str = LAYOUT_PATH) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+def previous_positions(layout: Optional[Dict]) -> Dict[str, Tuple[float, float]]:
+    """Unit-square positions from an exported layout, keyed by node name"""
+    if not layout:
+        return {}
+    nodes = layout["nodes"]
+    return {
+        name: ((x / LAYOUT_SCALE + 1) / 2, (y / LAYOUT_SCALE + 1) / 2)
+        for name, x, y in zip(nodes["name"], nodes["x"], nodes["y"])
+    }
+
+def compute_layout(names: List[str], edges: List[Tuple[str, str, str]], previous: Optional[Dict] = None):
+    """Positions for `names`, reusing the previous layout's coordinates where possible.
+
+    Returns (positions in the unit square, number of nodes that were newly placed).
+    """
+    if not names:
+        return np.zeros((0, 2)), 0
+
+    index = {name: i for i, name in enumerate(names)}
+    sources = np.array([index[s] for s, _, _ in edges], dtype=int)
+    targets = np.array([index[t] for _, t, _ in edges], dtype=int)
+    old = previous_positions(previous)
+
+    if not old:
+        return force_layout(len(names), sources, targets), len(names)
+
+    rng = np.random.default_rng(42)
+    pos = np.zeros((len(names), 2))
+    known = np.array([name in old for name in names])
+    for i, name in enumerate(names):
+        if known[i]:
+            pos[i] = old[name]
+
+    # New nodes start next to an already placed neighbor when they have one
+    neighbor = {}
+    for s, t in zip(sources, targets):
+        if known[t] and not known[s]:
+            neighbor.setdefault(s, t)
+        if known[s] and not known[t]:
+            neighbor.setdefault(t, s)
+    for i in np.flatnonzero(~known):
+        anchor = pos[neighbor[i]] if i in neighbor else rng.random(2)
+        pos[i] = anchor + rng.normal(scale=0.01, size=2)
+
+    mobility = np.where(known, 0.02, 1.0)
+    pos = force_layout(len(names), sources, targets, initial=pos, mobility=mobility,
+                       iterations=LAYOUT_INCREMENTAL_ITERATIONS, temperature=0.05)
+    return pos, int((~known).sum())
+
+def export_layout(names: List[str], edges: List[Tuple[str, str, str]], pos: np.ndarray,
+                  communities: List, degrees: List[int], path: str = LAYOUT_PATH) -> Dict:
+    """Columnar gzip JSON: integer coordinates, edges as node indices, edge types interned"""
+    if len(pos):
+        low, high = pos.min(axis=0), pos.max(axis=0)
+        scaled = ((pos - low) / np.maximum(high - low, 1e-9) * 2 - 1) * LAYOUT_SCALE
+    else:
+        # Fresh database: still write an empty layout so /graph/layout has something to serve
+        scaled = pos
+
+    index = {name: i for i, name in enumerate(names)}
+    types = sorted({rel for _, _, rel in edges})
+    type_index = {rel: i for i, rel in enumerate(types)}
+
+    layout = {
+        "graph_hash": graph_hash(names, edges),
+        "scale": LAYOUT_SCALE,
+        "nodes": {
+            "name": names,
+            "x": np.rint(scaled[:, 0]).astype(int).tolist(),
+            "y": np.rint(scaled[:, 1]).astype(int).tolist(),
+            "community": communities,
+            "degree": degrees,
+        },
+        "edges": {
+            "source": [index[s] for s, _, _ in edges],
+            "target": [index[t] for _, t, _ in edges],
+            "type": [type_index[rel] for _, _, rel in edges],
+        },
+        "edge_types": types,
+    }
+
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+        json.dump(layout, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return layout
@@ -0,0 +1,117 @@
+import os
+import re
+from urllib.parse import urljoin
+from typing import List, Optional, Tuple
+
+# bs4 (BeautifulSoup + html.parser, the original path) | lxml | selectolax
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+
+CONTENT_ID = "content"
+SIDEBAR_ID = "sidebar-first"
+
+# Strings BeautifulSoup's get_text() leaves out
+SKIP_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+ParsedPage = Tuple[Optional[str], List[str], bool]
+
+# lxml refuses a decoded str that still carries an "<?xml ... encoding=...?>" declaration
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+def parse_with_bs4(html: str, url: str) -> ParsedPage:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    content_div = soup.find('div', id=CONTENT_ID)
+    sidebar_div = soup.find('div', id=SIDEBAR_ID)
+
+    if not content_div:
+        return None, [], sidebar_div is not None
+
+    text = content_div.get_text(separator='\n', strip=True)
+
+    content_links = content_div.find_all('a', href=True)
+    sidebar_links = sidebar_div.find_all('a', href=True) if sidebar_div else []
+    links = [urljoin(url, a['href']) for a in content_links + sidebar_links]
+
+    return text, links, sidebar_div is not None
+
+def _lxml_walk(element, texts, hrefs):
+    """One pass over a subtree collecting stripped text nodes and link targets"""
+    if element.tag == "a" and element.get("href") is not None:
+        hrefs.append(element.get("href"))
+    if element.text:
+        stripped = element.text.strip()
+        if stripped:
+            texts.append(stripped)
+
+    for child in element:
+        # Comments have a non-string tag; their own text is skipped but their tail is not
+        if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:
+            _lxml_walk(child, texts, hrefs)
+        if child.tail:
+            stripped = child.tail.strip()
+            if stripped:
+                texts.append(stripped)
+
+def parse_with_lxml(html: str, url: str) -> ParsedPage:
+    import lxml.html
+
+    root = lxml.html.fromstring(XML_DECLARATION.sub("", html, count=1))
+    content = root.xpath(f'//div[@id="{CONTENT_ID}"]')
+    sidebar = root.xpath(f'//div[@id="{SIDEBAR_ID}"]')
+
+    if not content:
+        return None, [], bool(sidebar)
+
+    texts, hrefs = [], []
+    _lxml_walk(content[0], texts, hrefs)
+    if sidebar:
+        sidebar_hrefs = [a.get("href") for a in sidebar[0].iter("a") if a.get("href") is not None]
+        hrefs.extend(sidebar_hrefs)
+
+    return "\n".join(texts), [urljoin(url, href) for href in hrefs], bool(sidebar)
+
+def _selectolax_walk(node, texts, hrefs):
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            stripped = child.text_content.strip()
+            if stripped:
+                texts.append(stripped)
+        elif tag == "-comment" or tag in SKIP_TEXT_TAGS:
+            continue
+        else:
+            if tag == "a" and "href" in child.attributes:
+                hrefs.append(child.attributes["href"] or "")
+            _selectolax_walk(child, texts, hrefs)
+
+def parse_with_selectolax(html: str, url: str) -> ParsedPage:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    content = tree.css_first(f"div#{CONTENT_ID}")
+    sidebar = tree.css_first(f"div#{SIDEBAR_ID}")
+
+    if content is None:
+        return None, [], sidebar is not None
+
+    texts, hrefs = [], []
+    _selectolax_walk(content, texts, hrefs)
+    if sidebar is not None:
+        hrefs.extend(a.attributes["href"] or "" for a in sidebar.css("a[href]"))
+
+    return "\n".join(texts), [urljoin(url, href) for href in hrefs], sidebar is not None
+
+PARSERS = {
+    "bs4": parse_with_bs4,
+    "lxml": parse_with_lxml,
+    "selectolax": parse_with_selectolax,
+}
+
+def parse_page(html: str, url: str, parser: str = None) -> ParsedPage:
+    """Text of div#content plus links from it and div#sidebar-first.
+
+    Returns (text, links, has_sidebar); text is None when the page has no
+    content div. Module-level so it can be sent to a process pool.
+    """
+    return PARSERS[parser or HTML_PARSER](html, url)
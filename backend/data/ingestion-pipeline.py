@@ -1,11 +1,16 @@
 from dotenv import load_dotenv
 import os
-from triplet_extractor import TripletExtractor
-from triplet_ingestion import Neo4jTripletIngester
 import json
 
 load_dotenv()
 
+from triplet_extractor import TripletExtractor
+from triplet_ingestion import Neo4jTripletIngester
+from triplet_normalizer import TripletNormalizer
+
+INGEST_BATCH_SIZE = 10
+GRAPH_STATS_RECONCILE_EVERY = int(os.getenv("GRAPH_STATS_RECONCILE_EVERY", "100"))
+
 class TripletApp:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
@@ -25,6 +30,15 @@ class TripletApp:
             username=self.neo4j_username,
             password=self.neo4j_password
         )
+        self.ingester.create_indexes()
+        
+        # Shared across every file processed by this app, so repeats never reach Neo4j
+        self.normalizer = TripletNormalizer()
+        self.normalizer.preload(self.ingester.iter_existing_triplets())
+        
+        # Kept current from the writer's counters; reconcile_stats() re-counts the whole graph
+        self.stats = {}
+        self.reconcile_stats()
     
     def process_text(self, text, clear_db=False, model="meta-llama/llama-4-maverick-17b-128e-instruct"):
         try:
@@ -32,7 +46,24 @@ class TripletApp:
             # print(f"Text preview: {text[:200]}{'...' if len(text) > 200 else ''}")
             # print("-" * 50)
             
-            triplets = self.extractor.extract_triplets(text, model=model)
+            # Triplets are written in small batches while the model is still generating
+            triplets = []
+            batch = []
+            for triplet in self.extractor.iter_triplets(text, model=model):
+                if clear_db and not triplets:
+                    print("Clearing existing database...")
+                    self.ingester.clear_database()
+                    self.normalizer.seen.clear()
+                    self.stats.update(node_count=0, relationship_count=0, node_labels=[])
+                
+                triplets.append(triplet)
+                batch.append(triplet)
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    self.write_batch(batch)
+                    batch = []
+            
+            if batch:
+                self.write_batch(batch)
             
             if not triplets:
                 print("❌ No triplets extracted from the text")
@@ -41,16 +72,8 @@ class TripletApp:
             # print(f"Extracted {len(triplets)} triplets:")
             # for i, triplet in enumerate(triplets, 1):
             #     print(f"  {i}. {triplet.get('subject', 'N/A')} → {triplet.get('predicate', 'N/A')} → {triplet.get('object', 'N/A')}")
-            
-            # print("\nIngesting triplets into Neo4j...")
 
-            if clear_db:
-                print("Clearing existing database...")
-                self.ingester.clear_database()
-
-            self.ingester.create_triplet_nodes_and_relationships(triplets)
-
-            stats = self.ingester.get_graph_stats()
+            stats = dict(self.stats)
             
             # print(f"Successfully ingested triplets!")
             # print(f"Graph Stats:")
@@ -67,6 +90,26 @@ class TripletApp:
             print(f"❌ Error processing text: {e}")
             return {"triplets": [], "stats": None, "success": False, "error": str(e)}
     
+    def write_batch(self, batch):
+        fresh = self.normalizer.prepare(batch)
+        if fresh:
+            created = self.ingester.create_triplet_nodes_and_relationships(fresh)
+            self.normalizer.mark_written(fresh)
+            self.stats["node_count"] += created["nodes_created"]
+            self.stats["relationship_count"] += created["relationships_created"]
+            if created["nodes_created"] and ["Entity"] not in self.stats["node_labels"]:
+                self.stats["node_labels"].append(["Entity"])
+    
+    def reconcile_stats(self):
+        """Replace the running counts with a full count, e.g. after other jobs changed the graph"""
+        stats = self.ingester.get_graph_stats()
+        self.stats = {
+            "node_count": stats["node_count"],
+            "relationship_count": stats["relationship_count"],
+            "node_labels": list(stats["node_labels"]),
+        }
+        return self.stats
+    
     def query_graph(self, query):
         try:
             return self.ingester.query_graph(query)
@@ -82,6 +125,18 @@ class TripletApp:
             return []
     
     def get_popular_entities(self, limit=10):
+        # Degrees materialized by graph-analytics.py make this an index-ordered read
+        query = f"""
+            MATCH (n:Entity)
+            WHERE n.degree IS NOT NULL
+            RETURN n.name as entity, n.degree as connection_count
+            ORDER BY connection_count DESC
+            LIMIT {limit}
+        """
+        popular = self.query_graph(query)
+        if popular:
+            return popular
+
         query = f"""
             MATCH (n:Entity)-[r]-()
             RETURN n.name as entity, count(r) as connection_count
@@ -100,32 +155,27 @@ class TripletApp:
     def close(self):
         self.ingester.close()
 
-def text_pipeline(file_name, passed):
+def text_pipeline(app, file_name):
     with open(file_name, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     sample_text = data["text"]
 
     try:
-        app = TripletApp()
-
         result = app.process_text(sample_text)
         
         if result["success"]:
             print("✅ Passed")
-            passed = passed + 1
+            return True
         
-        else:
-            print("❌ Failed to process text")
-            if "error" in result:
-                print(f"Error: {result['error']}")
+        print("❌ Failed to process text")
+        if "error" in result:
+            print(f"Error: {result['error']}")
     
     except Exception as e:
         print(f"❌ Application error: {e}")
     
-    finally:
-        if 'app' in locals():
-            app.close()
+    return False
 
 
 # def main():
@@ -183,10 +233,25 @@ if __name__ == "__main__":
     passed = 0
     total = 0
 
-    for filename in os.listdir(directory):
-        filepath = os.path.join(directory, filename)
-        if os.path.isfile(filepath):
-            text_pipeline(filepath, passed)
-            total = total + 1
+    app = TripletApp()
+
+    try:
+        for filename in os.listdir(directory):
+            filepath = os.path.join(directory, filename)
+            if os.path.isfile(filepath):
+                if text_pipeline(app, filepath):
+                    passed = passed + 1
+                total = total + 1
+                if total % GRAPH_STATS_RECONCILE_EVERY == 0:
+                    app.reconcile_stats()
+    
+        drift = dict(app.stats)
+        app.reconcile_stats()
+        print (f"Graph: {app.stats['node_count']} nodes, {app.stats['relationship_count']} relationships "
+               f"(running count was {drift['node_count']}/{drift['relationship_count']})")
+    
+    finally:
+        app.close()
 
-    print (f"Passed {passed}/{total}")
\ No newline at end of file
+    print (f"Passed {passed}/{total}")
+    print (f"Triplets: {app.normalizer.stats}")
\ No newline at end of file
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+# Pages whose fingerprints differ in at most this many bits are near-duplicates.
+# Must stay below SIMHASH_BANDS so a match always shares at least one band.
+NEAR_DUPLICATE_BITS = int(os.getenv("NEAR_DUPLICATE_BITS", "3"))
+# Repeated lines shorter than this (headings, labels) are kept for context
+BOILERPLATE_MIN_CHARS = 40
+MIN_NOVEL_CHARS = 200
+SHINGLE_SIZE = 3
+
+def normalize_block(block: str) -> str:
+    return " ".join(block.casefold().split())
+
+def block_key(block: str) -> bytes:
+    return hashlib.blake2b(normalize_block(block).encode("utf-8"), digest_size=8).digest()
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> int:
+    """Charikar SimHash over word shingles; similar texts get fingerprints a few bits apart"""
+    words = re.findall(r"\w+", text.casefold())
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class PageDeduplicator:
+    """Drops repeated boilerplate blocks and near-duplicate pages before extraction.
+
+    Blocks are the lines produced by `get_text(separator='\\n')`. A long block
+    already kept on another page is removed; a page whose SimHash is within
+    NEAR_DUPLICATE_BITS of another page is skipped outright. Fingerprints
+    are split into bands so candidate pages are found by exact band lookups.
+
+    Blocks and fingerprints remember the URL they came from, and a page being
+    reprocessed (a recrawl) first forgets its own, so a changed page is compared
+    against other pages rather than against its previous version.
+    """
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_BITS, min_novel_chars: int = MIN_NOVEL_CHARS):
+        self.max_distance = max_distance
+        self.min_novel_chars = min_novel_chars
+        # Block key -> URL of the page it was kept on (None for blocks from old checkpoints)
+        self.block_sources: Dict[bytes, Optional[str]] = {}
+        self.page_blocks: Dict[str, Set[bytes]] = {}
+        self.fingerprints: Dict[str, int] = {}
+        self.bands: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+        self.stats = {"pages": 0, "near_duplicates": 0, "reduced": 0, "empty": 0,
+                      "chars_in": 0, "chars_out": 0}
+
+    def _band_keys(self, fingerprint: int):
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << width) - 1
+        return [(band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+    def find_near_duplicate(self, fingerprint: int, url: str = None):
+        """URL of an earlier page within max_distance bits, if any; a page never duplicates itself"""
+        for key in self._band_keys(fingerprint):
+            for other, other_url in self.bands.get(key, []):
+                if other_url != url and hamming_distance(fingerprint, other) <= self.max_distance:
+                    return other_url
+        return None
+
+    def add_fingerprint(self, fingerprint: int, url: str):
+        self.remove_fingerprint(url)
+        self.fingerprints[url] = fingerprint
+        for key in self._band_keys(fingerprint):
+            self.bands.setdefault(key, []).append((fingerprint, url))
+
+    def remove_fingerprint(self, url: str):
+        fingerprint = self.fingerprints.pop(url, None)
+        if fingerprint is None:
+            return
+        for key in self._band_keys(fingerprint):
+            self.bands[key].remove((fingerprint, url))
+
+    def add_block(self, key: bytes, url: Optional[str]):
+        self.block_sources.setdefault(key, url)
+        if url is not None and self.block_sources[key] == url:
+            self.page_blocks.setdefault(url, set()).add(key)
+
+    def forget_page(self, url: str):
+        """Drop a page's blocks and fingerprint before it is processed again"""
+        for key in self.page_blocks.pop(url, ()):
+            if self.block_sources.get(key) == url:
+                del self.block_sources[key]
+        self.remove_fingerprint(url)
+
+    def novel_blocks(self, text: str, url: str = None) -> Tuple[List[str], int]:
+        """Blocks of the page not kept on another page, and how many were dropped"""
+        blocks = []
+        dropped = 0
+        page_keys = set()
+        for block in text.split("\n"):
+            block = block.strip()
+            if not block:
+                continue
+            if len(block) >= BOILERPLATE_MIN_CHARS:
+                key = block_key(block)
+                if key in page_keys or (key in self.block_sources and self.block_sources[key] != url):
+                    dropped += 1
+                    continue
+                page_keys.add(key)
+                self.add_block(key, url)
+            blocks.append(block)
+        return blocks, dropped
+
+    def process(self, url: str, text: str, fingerprint: int = None) -> Tuple[str, str]:
+        """Returns (text to extract from, status); status is new, reduced, near_duplicate or empty"""
+        self.stats["pages"] += 1
+        self.stats["chars_in"] += len(text)
+
+        self.forget_page(url)
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        if self.find_near_duplicate(fingerprint, url):
+            self.stats["near_duplicates"] += 1
+            return "", "near_duplicate"
+        self.add_fingerprint(fingerprint, url)
+
+        blocks, dropped = self.novel_blocks(text, url)
+        reduced = "\n".join(blocks)
+        long_chars = sum(len(block) for block in blocks if len(block) >= BOILERPLATE_MIN_CHARS)
+        if dropped and long_chars < self.min_novel_chars:
+            # Only headings and labels survived; nothing worth an LLM call
+            self.stats["empty"] += 1
+            return "", "empty"
+
+        self.stats["chars_out"] += len(reduced)
+        if dropped:
+            self.stats["reduced"] += 1
+            return reduced, "reduced"
+        return reduced, "new"
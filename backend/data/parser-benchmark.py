@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from html_parsers import PARSERS, HTML_PARSER, parse_page
+import os
+import time
+
+# Raw pages saved by running web-scraper.py with SAVE_RAW_HTML_DIR=html_fixtures
+FIXTURES_DIR = os.getenv("PARSER_FIXTURES_DIR", "html_fixtures")
+FIXTURE_BASE_URL = "https://mosdac.gov.in/"
+REPEATS = int(os.getenv("PARSER_BENCHMARK_REPEATS", "3"))
+
+def load_fixtures():
+    pages = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if filename.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, filename), "r", encoding="utf-8") as f:
+                pages.append((filename, f.read()))
+    return pages
+
+def time_parser(name, pages):
+    """Best-of-REPEATS wall time to parse every fixture, plus the outputs"""
+    best = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        outputs = [PARSERS[name](html, FIXTURE_BASE_URL) for _, html in pages]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+def first_difference(ours, reference):
+    ours_lines, reference_lines = (ours or "").split("\n"), (reference or "").split("\n")
+    for i, (a, b) in enumerate(zip(ours_lines, reference_lines)):
+        if a != b:
+            return f"line {i}: {a[:60]!r} != {b[:60]!r}"
+    return f"{len(ours_lines)} lines != {len(reference_lines)} lines"
+
+def compare_parsers(pages):
+    results = {}
+    for name in PARSERS:
+        try:
+            results[name] = time_parser(name, pages)
+        except ImportError as e:
+            print(f"⚠️ Skipping {name}: {e}")
+
+    reference = results["bs4"][1]
+    base_time = results["bs4"][0]
+    print(f"\n{'parser':<12}{'total ms':>10}{'pages/s':>10}{'speedup':>9}{'same text':>11}{'same links':>12}")
+    for name, (elapsed, outputs) in results.items():
+        same_text = sum(out[0] == ref[0] for out, ref in zip(outputs, reference))
+        same_links = sum(out[1] == ref[1] for out, ref in zip(outputs, reference))
+        print(f"{name:<12}{elapsed * 1000:>10.1f}{len(pages) / elapsed:>10.1f}{base_time / elapsed:>8.1f}x"
+              f"{same_text:>7}/{len(pages):<3}{same_links:>8}/{len(pages):<3}")
+
+        mismatches = [
+            (filename, out, ref)
+            for (filename, _), out, ref in zip(pages, outputs, reference)
+            if out[0] != ref[0]
+        ]
+        for filename, out, ref in mismatches[:3]:
+            print(f"    ≠ {filename}: {first_difference(out[0], ref[0])}")
+
+def compare_process_pool(pages):
+    """Throughput of the configured parser inline versus in the scraper's process pool"""
+    started = time.perf_counter()
+    for _, html in pages:
+        parse_page(html, FIXTURE_BASE_URL)
+    inline = time.perf_counter() - started
+
+    with ProcessPoolExecutor() as pool:
+        # Warm the workers so start-up cost is not counted
+        list(pool.map(parse_page, [pages[0][1]] * (os.cpu_count() or 2), [FIXTURE_BASE_URL] * (os.cpu_count() or 2)))
+        started = time.perf_counter()
+        list(pool.map(parse_page, [html for _, html in pages], [FIXTURE_BASE_URL] * len(pages), chunksize=4))
+        pooled = time.perf_counter() - started
+
+    print(f"\n{HTML_PARSER}: inline {len(pages) / inline:.1f} pages/s, "
+          f"process pool {len(pages) / pooled:.1f} pages/s on {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    pages = load_fixtures()
+    if not pages:
+        print(f"❌ No .html fixtures in {FIXTURES_DIR}; crawl with SAVE_RAW_HTML_DIR={FIXTURES_DIR} first")
+    else:
+        print(f"Benchmarking {len(pages)} fixture pages ({sum(len(html) for _, html in pages) / 1e6:.1f} MB)")
+        compare_parsers(pages)
+        compare_process_pool(pages)
@@ -4,11 +4,66 @@ import re
 from dotenv import load_dotenv
 import os
 
+class IncrementalTripletParser:
+    """Pulls complete top-level {...} objects out of a streamed JSON array.
+
+    Text can be fed in arbitrary chunks; every object is returned as soon as its
+    closing brace arrives, so a truncated response still yields all the
+    triplets that were completed before the cut.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.buffer = []
+    
+    def feed(self, chunk):
+        triplets = []
+        for char in chunk:
+            if self.depth == 0:
+                # Skip array brackets, commas, code fences and any prose between objects
+                if char == '{':
+                    self.depth = 1
+                    self.buffer = [char]
+                continue
+            
+            self.buffer.append(char)
+            
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    triplet = self._decode(''.join(self.buffer))
+                    if triplet:
+                        triplets.append(triplet)
+                    self.buffer = []
+        
+        return triplets
+    
+    def _decode(self, json_str):
+        try:
+            obj = json.loads(json_str)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(obj, dict) and {'subject', 'predicate', 'object'} <= obj.keys():
+            return obj
+        return None
+
 class TripletExtractor:
     def __init__(self, api_key=None):
         self.client = Groq(api_key=api_key) if api_key else Groq()
     
-    def extract_triplets(self, text, model="meta-llama/llama-4-maverick-17b-128e-instruct"):      
+    def _build_messages(self, text):
         prompt = f"""Extract structured triplets (subject, predicate, object) from the following text. 
         
         IMPORTANT: Return ONLY a valid JSON array with no additional text, explanations, or formatting.
@@ -26,19 +81,49 @@ class TripletExtractor:
         [{{"subject": "...", "predicate": "...", "object": "..."}}, {{"subject": "...", "predicate": "...", "object": "..."}}]
         """
         
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert at extracting structured triplets from text for creation of graph databases. Always return valid JSON format."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def iter_triplets(self, text, model="meta-llama/llama-4-maverick-17b-128e-instruct"):
+        """Stream the completion and yield each triplet as soon as it is complete"""
+        parser = IncrementalTripletParser()
+        count = 0
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=self._build_messages(text),
+                temperature=0.1,
+                max_completion_tokens=1024,
+                top_p=0.9,
+                stream=True,
+                stop=None,
+            )
+            
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                for triplet in parser.feed(chunk.choices[0].delta.content or ""):
+                    count += 1
+                    yield triplet
+        
+        except Exception as e:
+            # Everything completed before the failure has already been yielded
+            print(f"Error during streaming API call after {count} triplets: {e}")
+    
+    def extract_triplets(self, text, model="meta-llama/llama-4-maverick-17b-128e-instruct"):      
         try:
             completion = self.client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at extracting structured triplets from text for creation of graph databases. Always return valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_messages(text),
                 temperature=0.1,
                 max_completion_tokens=1024,
                 top_p=0.9,
@@ -72,7 +157,7 @@ class TripletExtractor:
                 return triplets
             
             # Method 3: Find any JSON array in the response
-            json_match = re.search(r'\[(?:[^[\]]*|\[[^\]]*\])*\]', response_content, re.DOTALL)
+            json_match = re.search(r'\[(?:[^[\]]|\[[^\]]*\])*\]', response_content, re.DOTALL)
             if json_match:
                 json_str = json_match.group(0)
                 # Clean up the JSON string to remove any trailing incomplete parts
@@ -85,6 +170,12 @@ class TripletExtractor:
             return triplets
         
         except json.JSONDecodeError as e:
+            # Keep every object that was complete, e.g. when the array was truncated
+            salvaged = IncrementalTripletParser().feed(response_content)
+            if salvaged:
+                print(f"JSON parsing error: {e}; recovered {len(salvaged)} complete triplets")
+                return salvaged
+            
             print(f"JSON parsing error: {e}")
             print("Could not parse JSON from response. Raw response:")
             print(response_content[:500] + "..." if len(response_content) > 500 else response_content)
@@ -11,6 +11,68 @@ PASSWORD = os.getenv("NEO4J_PASSWORD")
 
 AUTH = (USERNAME, PASSWORD)
 
+# Bounds for k-hop expansion: neighbors kept per expanded node, degree above
+# which a node is returned but not expanded further, and total nodes returned
+KHOP_FANOUT = int(os.getenv("KHOP_FANOUT", "25"))
+KHOP_HUB_DEGREE = int(os.getenv("KHOP_HUB_DEGREE", "100"))
+KHOP_LIMIT = int(os.getenv("KHOP_LIMIT", "200"))
+
+def k_hop_neighborhood(session, entity_name: str, depth: int = 2, fanout: int = KHOP_FANOUT,
+                       hub_degree: int = KHOP_HUB_DEGREE, limit: int = KHOP_LIMIT) -> List[Dict]:
+    """Breadth-first expansion over RELATES edges.
+
+    Each reachable entity is returned once, at its minimum distance, together
+    with the edge it was first reached by. One query runs per hop, so the cost
+    is bounded by the fan-out and result caps rather than by the path count.
+    """
+    seen = {entity_name}
+    frontier = [entity_name]
+    neighbors = []
+
+    for distance in range(1, depth + 1):
+        if not frontier or len(neighbors) >= limit:
+            break
+
+        result = session.run("""
+            UNWIND $frontier AS source
+            MATCH (s:Entity {name: source})-[r:RELATES]-(n:Entity)
+            WHERE NOT n.name IN $seen
+            WITH source, n, r.type AS predicate, startNode(r) = s AS outgoing,
+                 coalesce(n.degree, COUNT { (n)--() }) AS degree
+            ORDER BY coalesce(n.pagerank, 0) DESC, degree DESC
+            WITH source, collect({name: n.name, predicate: predicate, outgoing: outgoing, degree: degree})[..$fanout] AS picked
+            UNWIND picked AS p
+            RETURN source, p.name AS name, p.predicate AS predicate, p.outgoing AS outgoing, p.degree AS degree
+            """,
+            frontier=frontier,
+            seen=list(seen),
+            fanout=fanout
+        )
+
+        next_frontier = []
+        for record in result:
+            name = record["name"]
+            if name in seen:
+                continue
+            seen.add(name)
+            neighbors.append({
+                "name": name,
+                "distance": distance,
+                "via": record["source"],
+                "predicate": record["predicate"],
+                "outgoing": record["outgoing"],
+                "degree": record["degree"],
+            })
+            # Hubs are reported but not expanded, otherwise they pull in most of the graph
+            if record["degree"] <= hub_degree:
+                next_frontier.append(name)
+            if len(neighbors) >= limit:
+                break
+
+        frontier = next_frontier
+
+    return neighbors
+
 class Neo4jTripletIngester:
     def __init__(self, uri, username, password):
         self.driver = GraphDatabase.driver(uri, auth=(username, password))
@@ -18,29 +80,54 @@ class Neo4jTripletIngester:
     def close(self):
         self.driver.close()
     
-    def create_triplet_nodes_and_relationships(self, triplets: List[Dict]):
+    def create_indexes(self):
         with self.driver.session() as session:
-            for triplet in triplets:
-                subject = triplet.get('subject', '').strip()
-                predicate = triplet.get('predicate', '').strip()
-                obj = triplet.get('object', '').strip()
-                
-                if subject and predicate and obj:
-                    session.run("""
-                        MERGE (s:Entity {name: $subject})
-                        MERGE (o:Entity {name: $object})
-                        MERGE (s)-[r:RELATES {type: $predicate}]->(o)
-                        """, 
-                        subject=subject, 
-                        object=obj, 
-                        predicate=predicate
-                    )
+            session.run("CREATE INDEX entity_name IF NOT EXISTS FOR (n:Entity) ON (n.name)")
+            session.run("CREATE INDEX relates_type IF NOT EXISTS FOR ()-[r:RELATES]-() ON (r.type)")
+    
+    def create_triplet_nodes_and_relationships(self, triplets: List[Dict]) -> Dict[str, int]:
+        """Write a batch of triplets in one UNWIND query; returns what the write created"""
+        rows = []
+        for triplet in triplets:
+            subject = triplet.get('subject', '').strip()
+            predicate = triplet.get('predicate', '').strip()
+            obj = triplet.get('object', '').strip()
+            
+            if subject and predicate and obj:
+                rows.append({"subject": subject, "predicate": predicate, "object": obj})
+        
+        if not rows:
+            return {"nodes_created": 0, "relationships_created": 0}
+        
+        with self.driver.session() as session:
+            summary = session.run("""
+                UNWIND $rows AS row
+                MERGE (s:Entity {name: row.subject})
+                MERGE (o:Entity {name: row.object})
+                MERGE (s)-[r:RELATES {type: row.predicate}]->(o)
+                """,
+                rows=rows
+            ).consume()
+            return {
+                "nodes_created": summary.counters.nodes_created,
+                "relationships_created": summary.counters.relationships_created,
+            }
+    
+    def iter_existing_triplets(self):
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (s:Entity)-[r:RELATES]->(o:Entity)
+                RETURN s.name as subject, r.type as predicate, o.name as object
+            """)
+            for record in result:
+                yield record.data()
     
     def clear_database(self):
         with self.driver.session() as session:
             session.run("MATCH (n) DETACH DELETE n")
     
     def get_graph_stats(self):
+        """Full scan of the graph; use for reconciliation, not after every write"""
         with self.driver.session() as session:
             result = session.run("""
                 MATCH (n)
@@ -56,14 +143,13 @@ class Neo4jTripletIngester:
             result = session.run(query)
             return [record for record in result]
     
-    def find_connections(self, entity_name: str, depth: int = 2):
+    def find_connections(self, entity_name: str, depth: int = 2, **limits):
         with self.driver.session() as session:
-            query = f"""
-                MATCH path = (start:Entity {{name: $entity_name}})-[*1..{depth}]-(connected)
-                RETURN path, connected.name as connected_name, length(path) as path_length
-            """
-            result = session.run(query, entity_name=entity_name)
-            return [record for record in result]
+            neighbors = k_hop_neighborhood(session, entity_name, depth, **limits)
+            return [
+                {**neighbor, "connected_name": neighbor["name"], "path_length": neighbor["distance"]}
+                for neighbor in neighbors
+            ]
 
 # def main():
 #     # Sample triplets (replace with your actual triplets)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+LEADING_ARTICLES = ("the ", "a ", "an ")
+# Same initials rule as entity_index.acronyms, which data scripts cannot import
+ACRONYM_STOPWORDS = {"of", "and", "the", "for", "in", "on", "at", "to", "a", "an", "&"}
+ALIASES_PATH = os.getenv("TRIPLET_ALIASES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "aliases.json"))
+
+def clean_name(name: str) -> str:
+    """Tidy a raw entity name for display: trim quotes/punctuation, collapse spaces, drop a leading article"""
+    name = " ".join(str(name).split()).strip(" \"'`.,;:")
+    lowered = name.lower()
+    for article in LEADING_ARTICLES:
+        if lowered.startswith(article) and len(name) > len(article):
+            return name[len(article):]
+    return name
+
+def canonical_key(name: str) -> str:
+    """Folding key: "the ISRO", "Isro" and "ISRO." share a key, as do "INSAT-3DR" and "INSAT 3DR" """
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", clean_name(name).casefold()).split())
+
+def initials(name: str) -> str:
+    words = [word for word in canonical_key(name).split() if word not in ACRONYM_STOPWORDS]
+    return "".join(word[0] for word in words) if len(words) >= 2 else ""
+
+def is_abbreviation(abbreviation: str, full_name: str) -> bool:
+    """ "SAC" for "Space Applications Centre", but not "Oceansat-2" or "Imager" in a trailing parenthetical"""
+    compact = canonical_key(abbreviation).replace(" ", "")
+    return (" " not in abbreviation.strip() and abbreviation.upper() == abbreviation
+            and len(compact) >= 2 and compact == initials(full_name))
+
+def canonical_predicate(predicate: str) -> str:
+    return " ".join(str(predicate).casefold().split()).strip(" \"'`.,;:")
+
+def triplet_key(subject_key: str, predicate: str, object_key: str) -> bytes:
+    # 16-byte digests keep the seen-set small even for millions of triplets
+    return hashlib.blake2b(f"{subject_key}\x1f{predicate}\x1f{object_key}".encode("utf-8"), digest_size=16).digest()
+
+class TripletNormalizer:
+    """Canonicalizes triplets and drops ones already written to the graph.
+
+    Names are folded to a canonical key; each key maps to one display name
+    (an alias-map entry, a name already in the graph, or the first spelling
+    seen). Written (subject, predicate, object) keys are remembered so repeats
+    from overlapping pages never reach Neo4j.
+    """
+    def __init__(self, aliases_path: str = ALIASES_PATH):
+        self.names: Dict[str, str] = {}
+        self.seen = set()
+        self.stats = {"received": 0, "invalid": 0, "duplicates": 0, "written": 0}
+
+        if aliases_path and os.path.exists(aliases_path):
+            with open(aliases_path, "r", encoding="utf-8") as f:
+                for canonical, aliases in json.load(f).items():
+                    self.add_alias(canonical, canonical)
+                    for alias in aliases:
+                        self.add_alias(alias, canonical)
+
+    def add_alias(self, alias: str, canonical: str):
+        self.names[canonical_key(alias)] = clean_name(canonical)
+
+    def preload(self, existing_triplets: Iterable[Dict]):
+        """Seed names and the seen-set from triplets already stored in the graph"""
+        for triplet in existing_triplets:
+            subject = self.add_existing(triplet["subject"])
+            obj = self.add_existing(triplet["object"])
+            self.seen.add(triplet_key(canonical_key(subject), canonical_predicate(triplet["predicate"]), canonical_key(obj)))
+
+    def add_existing(self, name: str) -> str:
+        """Register a stored node name as-is, so new facts MERGE into that node"""
+        cleaned = clean_name(name)
+        existing = self.names.setdefault(canonical_key(cleaned), cleaned)
+
+        # A stored "Space Applications Centre (SAC)" also claims its full name and abbreviation
+        match = re.match(r"^(.+?)\s*\(([^)]+)\)$", cleaned)
+        if match and is_abbreviation(match.group(2).strip(), match.group(1)):
+            self.names.setdefault(canonical_key(match.group(1)), existing)
+            self.names.setdefault(canonical_key(match.group(2)), existing)
+        return existing
+
+    def resolve(self, name: str) -> str:
+        cleaned = clean_name(name)
+        key = canonical_key(cleaned)
+        if key in self.names:
+            return self.names[key]
+
+        # "Space Applications Centre (SAC)" -> "Space Applications Centre", learning SAC as an alias.
+        # Other parentheticals ("Scatterometer (Oceansat-2)", "INSAT-3D (Imager)") stay part of the name.
+        match = re.match(r"^(.+?)\s*\(([^)]+)\)$", cleaned)
+        if match and is_abbreviation(match.group(2).strip(), match.group(1)):
+            full = self.resolve(match.group(1).strip())
+            self.names.setdefault(canonical_key(match.group(2)), full)
+            return full
+
+        return self.names.setdefault(key, cleaned)
+
+    def normalize(self, triplet: Dict) -> Optional[Dict]:
+        subject = triplet.get("subject")
+        predicate = triplet.get("predicate")
+        obj = triplet.get("object")
+        if not (isinstance(subject, str) and isinstance(predicate, str) and isinstance(obj, str)):
+            return None
+
+        subject, predicate, obj = self.resolve(subject), canonical_predicate(predicate), self.resolve(obj)
+        if not (canonical_key(subject) and predicate and canonical_key(obj)):
+            return None
+        return {"subject": subject, "predicate": predicate, "object": obj}
+
+    def key(self, triplet: Dict) -> bytes:
+        return triplet_key(canonical_key(triplet["subject"]), triplet["predicate"], canonical_key(triplet["object"]))
+
+    def prepare(self, triplets: List[Dict]) -> List[Dict]:
+        """Normalized triplets from this batch that have not been written before"""
+        fresh = []
+        batch_keys = set()
+        for triplet in triplets:
+            self.stats["received"] += 1
+            normalized = self.normalize(triplet)
+            if not normalized:
+                self.stats["invalid"] += 1
+                continue
+
+            key = self.key(normalized)
+            if key in self.seen or key in batch_keys:
+                self.stats["duplicates"] += 1
+                continue
+
+            batch_keys.add(key)
+            fresh.append(normalized)
+        return fresh
+
+    def mark_written(self, triplets: List[Dict]):
+        for triplet in triplets:
+            self.seen.add(self.key(triplet))
+        self.stats["written"] += len(triplets)
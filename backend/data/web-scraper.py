@@ -1,67 +1,149 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import json
 import os
+from page_dedup import PageDeduplicator, simhash
+from crawl_state import CrawlState, CRAWL_STATE_PATH, content_hash
+from html_parsers import parse_page
 
-def get_content_text(url):
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 2)))
+CRAWL_BATCH_SIZE = int(os.getenv("CRAWL_BATCH_SIZE", "16"))
+# When set, raw HTML is kept here as fixtures for parser-benchmark.py
+SAVE_RAW_HTML_DIR = os.getenv("SAVE_RAW_HTML_DIR", "")
+
+def fetch_html(url):
     try:
         res = requests.get(url, timeout=10)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        content_div = soup.find('div', id='content')
-        sidebar_div = soup.find('div', id='sidebar-first')
-
-        if not content_div:
-            print(f"❌ No <div id='content'> found in {url}")
-            return "", []
-        
-        if not sidebar_div:
-            print(f"❌ No <div id='sidebar'> found in {url}")
-
-        text = content_div.get_text(separator='\n', strip=True)
-
-        content_links = content_div.find_all('a', href=True)
-        sidebar_links = sidebar_div.find_all('a', href=True) if sidebar_div else []
-
-        links = [urljoin(url, a['href']) for a in content_links + sidebar_links]
-        
-        return text, links
-
     except Exception as e:
         print(f"❌ Failed to fetch {url}: {e}")
-        return "", []
+        return None
 
-def crawl_from_root(root_url, domain_limit=True, file_limit=100):
-    visited = set()
-    to_visit = [root_url]
-    files = 0
+    if SAVE_RAW_HTML_DIR:
+        with open(os.path.join(SAVE_RAW_HTML_DIR, f"{make_safe_filename(url)}.html"), "w", encoding="utf-8") as f:
+            f.write(res.text)
 
-    while to_visit and files < file_limit:
-        current_url = to_visit.pop(0)
-        if current_url in visited:
-            continue
+    return res.text
 
-        visited.add(current_url)
-        print(f"Visiting: {current_url}")
+def checked_parse(url, parsed):
+    """Log what the parser could not find and fall back to no text/links, like the original scraper"""
+    text, links, has_sidebar = parsed
+    if text is None:
+        print(f"❌ No <div id='content'> found in {url}")
+        return "", []
 
-        text, links = get_content_text(current_url)
+    if not has_sidebar:
+        print(f"❌ No <div id='sidebar'> found in {url}")
 
-        # print(f"✅ Extracted {len(text)} characters from {current_url}")
-        save_page_text(current_url, text)
-        files = files + 1
+    return text, links
 
-        for link in links:
-            full_url = urljoin(current_url, link)
+def get_content_text(url):
+    html = fetch_html(url)
+    if html is None:
+        return "", []
+    return checked_parse(url, parse_page(html, url))
+
+def fetch_and_parse(urls, fetch_pool, parse_pool):
+    """Fetch pages concurrently and hand each to the parse process pool as soon as it arrives.
+
+    Yields (url, text, links) in the order of `urls`.
+    """
+    fetches = {fetch_pool.submit(fetch_html, url): url for url in urls}
+    parses = {}
+    for future in as_completed(fetches):
+        html = future.result()
+        if html is not None:
+            url = fetches[future]
+            parses[url] = parse_pool.submit(parse_page, html, url)
+
+    for url in urls:
+        if url not in parses:
+            yield url, "", []
+            continue
+        try:
+            text, links = checked_parse(url, parses[url].result())
+        except Exception as e:
+            print(f"❌ Failed to parse {url}: {e}")
+            text, links = "", []
+        yield url, text, links
+
+def record_page(url, text, state, dedup):
+    """Save a fetched page's novel text and checkpoint it; returns whether a file was written"""
+    # print(f"✅ Extracted {len(text)} characters from {url}")
+    if not text:
+        state.record_fetch(url, "failed")
+        return False
+
+    page_hash = content_hash(text)
+    if page_hash == state.previous_hash(url):
+        print(f"💤 Unchanged: {url}")
+        state.record_unchanged(url)
+        return False
+
+    # Only the paragraphs not seen on earlier pages go on to triplet extraction
+    fingerprint = simhash(text)
+    text, status = dedup.process(url, text, fingerprint)
+    if status in ("near_duplicate", "empty"):
+        print(f"⏭️ Skipped ({status}): {url}")
+    else:
+        save_page_text(url, text)
+
+    state.record_fetch(url, status, page_hash, fingerprint, text)
+    return bool(text)
+
+def crawl_from_root(root_url, domain_limit=True, file_limit=100, state_path=CRAWL_STATE_PATH):
+    state = CrawlState(state_path)
+    dedup = PageDeduplicator()
+    state.load_dedup(dedup)
+    files = 0
 
-            if domain_limit:
-                if urlparse(full_url).netloc != urlparse(root_url).netloc:
-                    continue
+    counts = state.counts()
+    if counts:
+        print(f"🔁 Resuming crawl: {counts.get('queued', 0)} queued, {sum(counts.values()) - counts.get('queued', 0)} visited")
+    else:
+        state.enqueue([root_url])
 
-            if full_url not in visited:
-                to_visit.append(full_url)
+    try:
+        with ThreadPoolExecutor(FETCH_WORKERS) as fetch_pool, ProcessPoolExecutor(PARSE_WORKERS) as parse_pool:
+            while files < file_limit:
+                batch = state.next_queued(CRAWL_BATCH_SIZE)
+                if not batch:
+                    break
+
+                for current_url, text, links in fetch_and_parse(batch, fetch_pool, parse_pool):
+                    print(f"Visiting: {current_url}")
+                    if record_page(current_url, text, state, dedup):
+                        files = files + 1
+
+                    if domain_limit:
+                        links = [link for link in links if urlparse(link).netloc == urlparse(root_url).netloc]
+                    state.enqueue(links)
+
+                    # Pages fetched past the limit stay queued for the next run
+                    if files >= file_limit:
+                        break
+    finally:
+        print(f"🧹 Dedup: {dedup.stats}")
+        state.close()
+
+def recrawl_due_pages(limit=None, state_path=CRAWL_STATE_PATH):
+    """Revisit pages whose change-frequency schedule says they are due, instead of re-walking the sitemap"""
+    state = CrawlState(state_path)
+    dedup = PageDeduplicator()
+    state.load_dedup(dedup)
 
-os.makedirs("mosdac_scraped", exist_ok=True)
+    try:
+        due = state.due_pages(limit=limit)
+        print(f"🔁 {len(due)} pages due for recrawl")
+        with ThreadPoolExecutor(FETCH_WORKERS) as fetch_pool, ProcessPoolExecutor(PARSE_WORKERS) as parse_pool:
+            for start in range(0, len(due), CRAWL_BATCH_SIZE):
+                for url, text, links in fetch_and_parse(due[start:start + CRAWL_BATCH_SIZE], fetch_pool, parse_pool):
+                    print(f"Revisiting: {url}")
+                    record_page(url, text, state, dedup)
+    finally:
+        print(f"🧹 Dedup: {dedup.stats}")
+        state.close()
 
 import re
 
@@ -84,8 +166,17 @@ def save_page_text(url, text):
 
     print(f"💾 Saved: {filename}")
 
-crawl_from_root("https://mosdac.gov.in/sitemap")
+if __name__ == "__main__":
+    # The guard matters: the parse process pool re-imports this module in its workers
+    os.makedirs("mosdac_scraped", exist_ok=True)
+    if SAVE_RAW_HTML_DIR:
+        os.makedirs(SAVE_RAW_HTML_DIR, exist_ok=True)
+
+    if os.getenv("CRAWL_MODE", "").lower() == "recrawl":
+        recrawl_due_pages()
+    else:
+        crawl_from_root("https://mosdac.gov.in/sitemap")
 
-# text, link = get_content_text("https://mosdac.gov.in/insat-3dr")
+    # text, link = get_content_text("https://mosdac.gov.in/insat-3dr")
 
-# print(link)
\ No newline at end of file
+    # print(link)
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "3"))
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+
+
+class BatchingEmbeddingService(Embeddings):
+    """Shares one embedding model between concurrent request threads.
+
+    Single-text requests are queued and a worker thread runs them through the
+    model in batches of up to `max_batch`. When the previous batch held more
+    than one text (i.e. we are under load) the worker waits up to `window_ms`
+    for more texts to arrive; when idle it runs immediately, so a lone request
+    pays no extra latency. Recent results are kept in an LRU cache.
+    """
+
+    def __init__(self, embedder: Embeddings, window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_batch: int = EMBED_MAX_BATCH, cache_size: int = EMBED_CACHE_SIZE):
+        self.embedder = embedder
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._closed_lock = threading.Lock()
+        self._last_batch_size = 0
+        self._stats = {"requests": 0, "cache_hits": 0, "batches": 0, "batched_texts": 0}
+        self._stats_lock = threading.Lock()
+
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def _cache_get(self, text: str):
+        with self._cache_lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+            return vector
+
+    def _cache_put(self, text: str, vector: List[float]):
+        with self._cache_lock:
+            self._cache[text] = vector
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("Embedding service is closed")
+
+    def submit(self, text: str) -> Future:
+        """Queue one text for embedding; the future resolves to its vector"""
+        self._check_open()
+        self._count("requests")
+        future = Future()
+
+        cached = self._cache_get(text)
+        if cached is not None:
+            self._count("cache_hits")
+            future.set_result(cached)
+            return future
+
+        # Checked again under the lock so nothing is queued behind the shutdown sentinel
+        with self._closed_lock:
+            self._check_open()
+            self._queue.put((text, future))
+        return future
+
+    def _collect_batch(self, first) -> list:
+        batch = [first]
+        deadline = time.monotonic() + (self.window if self._last_batch_size > 1 else 0)
+
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if item is None:
+                # Shutdown sentinel: finish this batch, then let _run see it
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect_batch(first)
+            self._last_batch_size = len(batch)
+
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.embedder.embed_documents(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self._count("batches")
+            self._count("batched_texts", len(texts))
+            for text, vector in vectors.items():
+                self._cache_put(text, vector)
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._check_open()
+        # Bulk calls (index builds) are already batched; send them straight to the model
+        return self.embedder.embed_documents(texts)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._cache_lock:
+            cache_entries = len(self._cache)
+        batches = stats["batches"]
+        return {
+            **stats,
+            "avg_batch_size": round(stats["batched_texts"] / batches, 2) if batches else 0.0,
+            "cache_entries": cache_entries,
+        }
+
+    def close(self):
+        """Stop accepting texts, finish the ones already queued and stop the worker"""
+        with self._closed_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
@@ -0,0 +1,134 @@
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# huggingface (PyTorch via sentence-transformers) | onnx | onnx_int8
+EMBEDDINGS_BACKEND = os.getenv("EMBEDDINGS_BACKEND", "huggingface")
+ONNX_MODEL_DIR = os.getenv(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_models", "all-MiniLM-L6-v2"),
+)
+PARITY_MIN_COSINE = float(os.getenv("EMBEDDINGS_PARITY_MIN_COSINE", "0.98"))
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = False) -> Path:
+    """Export the transformer to ONNX (and optionally int8-quantize it) once, on first use.
+
+    Export needs optimum + torch; serving the exported model only needs onnxruntime.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from tokenizers import Tokenizer
+
+    output = Path(output_dir)
+    fp32_path = output / "model.onnx"
+
+    if not fp32_path.exists():
+        print(f"Exporting {model_name} to ONNX in {output}...")
+        ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(output)
+        Tokenizer.from_pretrained(model_name).save(str(output / "tokenizer.json"))
+
+    if not quantize:
+        return fp32_path
+
+    int8_path = output / "model_int8.onnx"
+    if not int8_path.exists():
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        print("Quantizing ONNX model to int8...")
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEmbeddings(Embeddings):
+    """all-MiniLM-L6-v2 on ONNX Runtime, reproducing the sentence-transformers
+    pipeline (mean pooling over the attention mask, then L2 normalization)."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, model_dir: str = ONNX_MODEL_DIR,
+                 quantize: bool = False, max_length: int = 256, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = export_onnx_model(model_name, model_dir, quantize=quantize)
+
+        self.tokenizer = Tokenizer.from_file(str(Path(model_dir) / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_batch(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def load_embeddings(backend: str = None) -> Embeddings:
+    """Create the MiniLM embedder for the configured backend"""
+    backend = backend or EMBEDDINGS_BACKEND
+
+    if backend == "huggingface":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    if backend == "onnx":
+        return OnnxEmbeddings()
+    if backend == "onnx_int8":
+        return OnnxEmbeddings(quantize=True)
+
+    raise ValueError(f"Unknown EMBEDDINGS_BACKEND: {backend}. Expected huggingface, onnx or onnx_int8")
+
+
+def check_parity(texts: List[str], backend: str = "onnx_int8", min_cosine: float = PARITY_MIN_COSINE) -> float:
+    """Compare an alternative backend against the PyTorch embeddings; returns the worst cosine"""
+    reference = np.asarray(load_embeddings("huggingface").embed_documents(texts))
+    candidate = np.asarray(load_embeddings(backend).embed_documents(texts))
+
+    cosines = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    worst = float(cosines.min())
+    print(f"{backend}: min cosine {worst:.4f}, mean cosine {float(cosines.mean()):.4f} over {len(texts)} texts")
+
+    if worst < min_cosine:
+        raise AssertionError(f"{backend} embeddings drifted below cosine {min_cosine} (worst {worst:.4f})")
+    return worst
+
+
+if __name__ == "__main__":
+    docs_dir = Path(os.path.dirname(os.path.abspath(__file__))) / "data" / "documents"
+    sample = [
+        line.strip()
+        for path in sorted(docs_dir.glob("*.txt"))
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ][:200]
+    sample += ["INSAT-3DR", "What is MOSDAC?", "Space Applications Centre (SAC)", "cyclone warning"]
+
+    for name in ("onnx", "onnx_int8"):
+        check_parity(sample, backend=name)
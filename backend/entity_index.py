@@ -0,0 +1,123 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+ACRONYM_STOPWORDS = {"of", "and", "the", "for", "in", "on", "at", "to", "a", "an", "&"}
+ACRONYM_CONFIDENCE = 0.9
+TRIGRAM_MIN_SCORE = 0.75
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and turn hyphens, underscores and punctuation into single spaces"""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", name.lower()).split())
+
+
+def compact_key(name: str) -> str:
+    """Key under which spacing and hyphenation variants collide ("INSAT-3DR" == "insat 3dr")"""
+    return normalize_name(name).replace(" ", "")
+
+
+def identifying_tokens(name: str) -> frozenset:
+    """Tokens with a digit ("3d", "3dr", "2"); names that differ in these are different
+    satellites, not spellings (the rule data/entity-compaction.py merges by)"""
+    return frozenset(token for token in normalize_name(name).split() if any(c.isdigit() for c in token))
+
+
+def acronyms(name: str) -> List[str]:
+    """Acronyms implied by a name: explicit "(SAC)" suffixes and word initials"""
+    found = [compact_key(a) for a in re.findall(r"\(([^)]+)\)", name)]
+
+    base = re.sub(r"\([^)]*\)", " ", name)
+    words = [w for w in normalize_name(base).split() if w not in ACRONYM_STOPWORDS]
+    if len(words) >= 2:
+        found.append("".join(w[0] for w in words))
+
+    return [a for a in found if len(a) >= 2]
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LexicalEntityIndex:
+    """In-memory name index that resolves spelling, spacing and acronym variants
+    before the caller falls back to an embedding search."""
+
+    def __init__(self, min_score: float = TRIGRAM_MIN_SCORE):
+        self.min_score = min_score
+        self.by_key: Dict[str, str] = {}
+        self.aliases: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.grams: Dict[str, set] = {}
+        self.postings: Dict[str, set] = defaultdict(set)
+
+    def __len__(self):
+        return len(self.by_key)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], min_score: float = TRIGRAM_MIN_SCORE) -> "LexicalEntityIndex":
+        index = cls(min_score=min_score)
+        for name in names:
+            index.add(name)
+        return index
+
+    def add(self, name: str):
+        key = compact_key(name)
+        if not key or key in self.by_key:
+            return
+
+        self.by_key[key] = name
+        grams = trigrams(key)
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings[gram].add(key)
+
+        for acronym in acronyms(name):
+            if acronym != key:
+                self.aliases[acronym].setdefault(name, ACRONYM_CONFIDENCE)
+
+    def add_alias(self, alias: str, name: str, confidence: float):
+        """Remember that `alias` resolved to `name` (e.g. from an embedding match)"""
+        key = compact_key(alias)
+        # "Oceansat-2" close to "Oceansat-3" in embedding space is still a different satellite
+        if identifying_tokens(alias) != identifying_tokens(name):
+            return
+        if key and key != compact_key(name):
+            previous = self.aliases[key].get(name, 0.0)
+            self.aliases[key][name] = max(previous, confidence)
+
+    def lookup(self, query: str) -> Optional[Dict]:
+        """Resolve a query string to an entity name with a similarity score, or None"""
+        key = compact_key(query)
+        if not key:
+            return None
+
+        if key in self.by_key:
+            return {"name": self.by_key[key], "score": 1.0, "method": "normalized"}
+
+        candidates = self.aliases.get(key)
+        if candidates and len(candidates) == 1:
+            name, confidence = next(iter(candidates.items()))
+            return {"name": name, "score": confidence, "method": "alias"}
+
+        return self._trigram_lookup(key, identifying_tokens(query))
+
+    def _trigram_lookup(self, key: str, tokens: frozenset) -> Optional[Dict]:
+        query_grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for candidate in self.postings.get(gram, ()):
+                shared[candidate] += 1
+
+        best_key, best_score = None, 0.0
+        for candidate, overlap in shared.items():
+            if identifying_tokens(self.by_key[candidate]) != tokens:
+                continue
+            score = 2 * overlap / (len(query_grams) + len(self.grams[candidate]))
+            if score > best_score:
+                best_key, best_score = candidate, score
+
+        if best_key is None or best_score < self.min_score:
+            return None
+
+        return {"name": self.by_key[best_key], "score": round(best_score, 3), "method": "trigram"}
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from data.triplet_ingestion import k_hop_neighborhood
+
+GRAPH_SEED_LIMIT = int(os.getenv("GRAPH_SEED_LIMIT", "50"))
+GRAPH_EXPAND_LIMIT = int(os.getenv("GRAPH_EXPAND_LIMIT", "25"))
+GRAPH_VIEWPORT_LIMIT = int(os.getenv("GRAPH_VIEWPORT_LIMIT", "300"))
+GRAPH_MAX_NODES = 1000
+GRAPH_MAX_EDGES = 5000
+GRAPH_CACHE_SECONDS = float(os.getenv("GRAPH_CACHE_SECONDS", "30"))
+GRAPH_CACHE_SIZE = 256
+
+NODE_FIELDS = ["name", "degree", "pagerank", "community"]
+EDGE_FIELDS = ["source", "target", "type"]
+
+NODE_COLUMNS = """
+    n.name AS name,
+    coalesce(n.degree, COUNT { (n)--() }) AS degree,
+    coalesce(n.pagerank, 0.0) AS pagerank,
+    n.community AS community
+"""
+
+
+class Subgraph:
+    """Compact wire format: nodes are rows of NODE_FIELDS, edges index into the node list"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.nodes: List[list] = []
+        self.edges: List[list] = []
+        self._edge_keys = set()
+
+    def add_node(self, record) -> int:
+        name = record["name"]
+        if name not in self.index:
+            self.index[name] = len(self.nodes)
+            self.nodes.append([name, record["degree"], round(record["pagerank"], 6), record["community"]])
+        return self.index[name]
+
+    def add_edge(self, source: str, target: str, rel_type: str):
+        if source not in self.index or target not in self.index:
+            return
+        key = (self.index[source], self.index[target], rel_type)
+        if key not in self._edge_keys:
+            self._edge_keys.add(key)
+            self.edges.append(list(key))
+
+    def to_dict(self, **extra) -> Dict:
+        return {
+            "node_fields": NODE_FIELDS,
+            "edge_fields": EDGE_FIELDS,
+            "nodes": self.nodes,
+            "edges": self.edges,
+            **extra,
+        }
+
+
+def fetch_nodes(session, names: List[str]):
+    return session.run(f"""
+        UNWIND $names AS name
+        MATCH (n:Entity {{name: name}})
+        RETURN {NODE_COLUMNS}
+    """, names=names)
+
+
+def add_edges_among(session, graph: Subgraph):
+    """Every RELATES edge whose two ends are both already in the subgraph"""
+    result = session.run("""
+        UNWIND $names AS name
+        MATCH (a:Entity {name: name})-[r:RELATES]->(b:Entity)
+        WHERE b.name IN $names
+        RETURN a.name AS source, b.name AS target, r.type AS type
+        LIMIT $limit
+    """, names=list(graph.index), limit=GRAPH_MAX_EDGES)
+    for record in result:
+        graph.add_edge(record["source"], record["target"], record["type"])
+
+
+def seed_subgraph(session, limit: int = GRAPH_SEED_LIMIT, entity: Optional[str] = None) -> Dict:
+    """Starting view: the top entities by PageRank, or one entity and its best neighbors"""
+    graph = Subgraph()
+    if entity:
+        neighbors = k_hop_neighborhood(session, entity, depth=1, fanout=limit, limit=limit)
+        names = [entity] + [neighbor["name"] for neighbor in neighbors]
+    else:
+        names = [record["name"] for record in session.run("""
+            MATCH (n:Entity)
+            RETURN n.name AS name
+            ORDER BY coalesce(n.pagerank, 0.0) DESC, coalesce(n.degree, 0) DESC
+            LIMIT $limit
+        """, limit=limit)]
+
+    for record in fetch_nodes(session, names):
+        graph.add_node(record)
+    add_edges_among(session, graph)
+    return graph.to_dict()
+
+
+def expand_node(session, name: str, offset: int = 0, limit: int = GRAPH_EXPAND_LIMIT) -> Dict:
+    """One page of a node's neighbors, most important first, for expand-on-click"""
+    graph = Subgraph()
+    for record in fetch_nodes(session, [name]):
+        graph.add_node(record)
+
+    result = session.run(f"""
+        MATCH (s:Entity {{name: $name}})-[r:RELATES]-(n:Entity)
+        WITH s, n, collect({{type: r.type, outgoing: startNode(r) = s}}) AS rels
+        ORDER BY coalesce(n.pagerank, 0.0) DESC, n.name
+        SKIP $offset
+        LIMIT $limit
+        RETURN {NODE_COLUMNS}, rels
+    """, name=name, offset=offset, limit=limit + 1)
+    records = list(result)
+
+    for record in records[:limit]:
+        graph.add_node(record)
+        for rel in record["rels"]:
+            if rel["outgoing"]:
+                graph.add_edge(name, record["name"], rel["type"])
+            else:
+                graph.add_edge(record["name"], name, rel["type"])
+
+    has_more = len(records) > limit
+    return graph.to_dict(next_offset=offset + limit if has_more else None)
+
+
+def viewport_subgraph(session, center: str, depth: int = 2, limit: int = GRAPH_VIEWPORT_LIMIT) -> Dict:
+    """Bounded k-hop view around the node the user is looking at, capped at `limit` nodes"""
+    graph = Subgraph()
+    neighbors = k_hop_neighborhood(session, center, depth=depth, limit=limit - 1)
+    names = [center] + [neighbor["name"] for neighbor in neighbors]
+
+    for record in fetch_nodes(session, names):
+        graph.add_node(record)
+    add_edges_among(session, graph)
+    return graph.to_dict(truncated=len(neighbors) >= limit - 1)
+
+
+def compact_json(payload: Dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class TTLCache:
+    """Small LRU of serialized graph responses so repeated views skip Neo4j for a few seconds"""
+
+    def __init__(self, ttl: float = GRAPH_CACHE_SECONDS, size: int = GRAPH_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
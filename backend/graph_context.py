@@ -0,0 +1,110 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+import tiktoken
+
+GRAPH_CONTEXT_TOKEN_BUDGET = int(os.getenv("GRAPH_CONTEXT_TOKEN_BUDGET", "1500"))
+GRAPH_CONTEXT_ENCODING = os.getenv("GRAPH_CONTEXT_ENCODING", "cl100k_base")
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "in", "on", "at", "to",
+    "for", "by", "with", "and", "or", "what", "which", "who", "whom", "how", "why",
+    "when", "where", "does", "do", "did", "about", "tell", "me", "from", "it", "its",
+    "this", "that", "these", "those", "can", "you", "please",
+}
+
+_encoding = None
+
+
+def get_encoding():
+    """Load the tokenizer used to measure prompt context (cached)"""
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding(GRAPH_CONTEXT_ENCODING)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text))
+
+
+def _terms(text: str) -> set:
+    return {t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS}
+
+
+class GraphRow:
+    """One projected retrieval row: names, predicate and element ids only, no node properties"""
+    __slots__ = ("subject", "predicate", "object", "subject_id", "object_id", "distance")
+
+    def __init__(self, subject: str, predicate: Optional[str] = None, object: Optional[str] = None,
+                 subject_id: Optional[str] = None, object_id: Optional[str] = None,
+                 distance: Optional[int] = None):
+        self.subject = subject
+        self.predicate = predicate
+        self.object = object
+        self.subject_id = subject_id
+        self.object_id = object_id
+        self.distance = distance
+
+    @classmethod
+    def from_record(cls, record) -> "GraphRow":
+        return cls(record.get("subject"), record.get("predicate"), record.get("object"),
+                   record.get("subject_id"), record.get("object_id"))
+
+    def __repr__(self) -> str:
+        return f"GraphRow({self.subject!r}, {self.predicate!r}, {self.object!r})"
+
+
+def row_to_fact(row: GraphRow) -> Optional[Tuple[tuple, str]]:
+    """Convert one GraphRow into a (dedup key, `subject -[rel]-> object`) pair"""
+    if row.subject and row.object and row.predicate:
+        return (row.subject.lower(), row.predicate.lower(), row.object.lower()), f"{row.subject} -[{row.predicate}]-> {row.object}"
+    if row.subject:
+        return (row.subject.lower(),), row.subject
+    return None
+
+
+def rank_facts(question: str, facts: List[str], boost_terms: List[str] = None) -> List[str]:
+    """Order facts by term overlap with the question, keeping graph order for ties"""
+    query_terms = _terms(question)
+    boost = _terms(" ".join(boost_terms or []))
+
+    def score(indexed):
+        position, fact = indexed
+        fact_terms = _terms(fact)
+        return (-(len(fact_terms & query_terms) + 2 * len(fact_terms & boost)), position)
+
+    return [fact for _, fact in sorted(enumerate(facts), key=score)]
+
+
+def build_graph_context(question: str, graph_data: List[GraphRow], token_budget: int = None,
+                        boost_terms: List[str] = None) -> Tuple[str, int]:
+    """Serialize graph rows into deduplicated triples packed up to a token budget.
+
+    Returns the context text and the number of facts that made it in.
+    """
+    budget = GRAPH_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+
+    seen = set()
+    facts = []
+    for row in graph_data:
+        converted = row_to_fact(row)
+        if not converted:
+            continue
+        key, fact = converted
+        if key in seen:
+            continue
+        seen.add(key)
+        facts.append(fact)
+
+    lines = []
+    used = 0
+    for fact in rank_facts(question, facts, boost_terms):
+        cost = count_tokens(fact + "\n")
+        if used + cost > budget:
+            continue
+        lines.append(fact)
+        used += cost
+
+    return "\n".join(lines), len(lines)
@@ -0,0 +1,305 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+LLM_HEDGE_MIN_DELAY_MS = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "500"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "30"))
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer in time; callers should degrade gracefully"""
+
+
+class DeadlineExceeded(LLMUnavailable):
+    pass
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+class RateLimited(LLMUnavailable):
+    pass
+
+
+class ProviderError(LLMUnavailable):
+    """Every attempt failed at the provider; the original error is chained as __cause__"""
+
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Give every LLM call made inside the block a shared absolute deadline"""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time(default: float = LLM_TIMEOUT_SECONDS) -> float:
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline - time.monotonic())
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_timeout`
+    a single trial call is let through (half-open) to probe recovery."""
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a half-open trial slot that was never used"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """Client-side rate limit so bursts queue here instead of getting 429s upstream"""
+
+    def __init__(self, rate_per_minute: float = LLM_RATE_PER_MINUTE, capacity: float = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or max(1.0, rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: float) -> bool:
+        """Block until a token is available or `timeout` seconds pass"""
+        end = time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+            with self._lock:
+                wait_for = (1 - self._tokens) / self.rate if self.rate else timeout
+            if time.monotonic() + wait_for > end:
+                return False
+            time.sleep(wait_for)
+
+
+class ResilientCaller:
+    """Deadline-bounded, rate-limited, circuit-broken calls with a hedged duplicate.
+
+    If the first attempt has not returned after `hedge_after_ms` (the model's
+    recent p95, never less than the minimum hedge delay), one duplicate is sent
+    and whichever finishes first wins. `hedge_after_ms=None` disables the hedge.
+    """
+
+    def __init__(self, breaker: CircuitBreaker = None, bucket: TokenBucket = None,
+                 executor: ThreadPoolExecutor = None, hedge_min_delay_ms: float = LLM_HEDGE_MIN_DELAY_MS):
+        self.breaker = breaker or CircuitBreaker()
+        self.bucket = bucket or TokenBucket()
+        self.executor = executor or ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm")
+        self.hedge_min_delay = hedge_min_delay_ms / 1000
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0,
+                       "rejected_open": 0, "rate_limited": 0, "provider_errors": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def call(self, fn: Callable, hedge_after_ms: Optional[float] = None):
+        self._count("calls")
+        remaining = remaining_time()
+        if remaining <= 0:
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded("Request deadline already passed")
+
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        if not self.bucket.acquire(timeout=remaining):
+            self._count("rate_limited")
+            self.breaker.release()
+            raise RateLimited("LLM rate limit would exceed the request deadline")
+
+        end = time.monotonic() + remaining_time()
+        primary = self.executor.submit(fn)
+        pending = {primary}
+
+        hedge_delay = max(self.hedge_min_delay, (hedge_after_ms or 0) / 1000)
+        if hedge_after_ms is not None and hedge_delay < end - time.monotonic():
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done and self.bucket.try_acquire():
+                self._count("hedges")
+                pending.add(self.executor.submit(fn))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    self.breaker.record_success()
+                    return future.result()
+                error = future.exception()
+
+        self.breaker.record_failure()
+        if error is not None and not pending:
+            self._count("provider_errors")
+            raise ProviderError(f"LLM provider call failed: {error}") from error
+        self._count("deadline_exceeded")
+        raise DeadlineExceeded("LLM call did not finish before the deadline")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "breaker": self.breaker.state}
+
+
+class FakeLLM:
+    """Local stand-in for ChatGroq with injected latency and failures, for exercising the resilience layer"""
+
+    def __init__(self, model_name: str = "fake", latency_ms: float = 50, jitter_ms: float = 0,
+                 slow_rate: float = 0.0, slow_ms: float = 5000, failure_rate: float = 0.0):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.failure_rate = failure_rate
+
+    def invoke(self, prompt: str):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if random.random() < self.slow_rate:
+            delay = self.slow_ms
+        time.sleep(delay / 1000)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("injected provider failure")
+
+        class Response:
+            content = f"fake answer to: {prompt[:40]}"
+            usage_metadata = {"input_tokens": len(prompt.split()), "output_tokens": 5}
+            response_metadata = {}
+
+        return Response()
+
+
+if __name__ == "__main__":
+    # Hedging: 10% of calls stall for 3s; without a hedge p95 would sit at the 2s deadline.
+    # Both attempts stalling (~1% of calls) still misses the deadline.
+    slow = FakeLLM(latency_ms=80, jitter_ms=40, slow_rate=0.1, slow_ms=3000)
+    caller = ResilientCaller(bucket=TokenBucket(rate_per_minute=6000), hedge_min_delay_ms=100)
+    latencies = []
+    for _ in range(100):
+        started = time.perf_counter()
+        try:
+            with deadline_scope(2.0):
+                caller.call(lambda: slow.invoke("hello"), hedge_after_ms=150)
+        except DeadlineExceeded:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    stats = caller.stats()
+    print(f"hedged: p50={latencies[49]:.0f}ms p95={latencies[94]:.0f}ms p99={latencies[98]:.0f}ms stats={stats}")
+    assert stats["hedges"] > 0 and stats["hedge_wins"] > 0
+    assert latencies[94] < 1000, "hedge did not cut the slow tail"
+    assert stats["deadline_exceeded"] <= 5
+
+    # Without a latency estimate there is no hedge, so nothing is duplicated
+    caller = ResilientCaller(bucket=TokenBucket(rate_per_minute=6000), hedge_min_delay_ms=10)
+    caller.call(lambda: FakeLLM(latency_ms=100).invoke("hello"), hedge_after_ms=None)
+    assert caller.stats()["hedges"] == 0
+
+    # Provider errors surface as LLMUnavailable with the original error chained
+    broken = FakeLLM(latency_ms=10, failure_rate=1.0)
+    caller = ResilientCaller(breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.5),
+                             bucket=TokenBucket(rate_per_minute=6000))
+    outcomes = []
+    for _ in range(6):
+        try:
+            caller.call(lambda: broken.invoke("hello"))
+        except LLMUnavailable as e:
+            outcomes.append(type(e).__name__)
+            if isinstance(e, ProviderError):
+                assert isinstance(e.__cause__, RuntimeError)
+    print(f"breaker: {outcomes} stats={caller.stats()}")
+    # Circuit breaking: three failures open the breaker, further calls fail fast
+    assert outcomes == ["ProviderError"] * 3 + ["CircuitOpenError"] * 3
+    assert caller.stats()["breaker"] == "open"
+
+    # After reset_timeout one half-open trial goes through; success closes the breaker
+    time.sleep(0.6)
+    assert caller.breaker.state == "half_open"
+    healthy = FakeLLM(latency_ms=10)
+    caller.call(lambda: healthy.invoke("hello"))
+    assert caller.breaker.state == "closed"
+
+    # Rate limiting: with an empty bucket the call is rejected instead of outliving the deadline
+    caller = ResilientCaller(bucket=TokenBucket(rate_per_minute=1, capacity=1))
+    caller.call(lambda: healthy.invoke("hello"))
+    try:
+        with deadline_scope(0.5):
+            caller.call(lambda: healthy.invoke("hello"))
+        raise AssertionError("second call should have been rate limited")
+    except RateLimited:
+        pass
+    assert caller.stats()["rate_limited"] == 1 and caller.breaker.state == "closed"
+    print(f"rate limit: {caller.stats()}")
+    print("✅ resilience checks passed")
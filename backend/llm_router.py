@@ -0,0 +1,158 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from langchain_groq import ChatGroq
+from llm_resilience import ResilientCaller, LLMUnavailable, LLM_TIMEOUT_SECONDS
+
+SMALL_MODEL = os.getenv("GROQ_SMALL_MODEL", "llama-3.1-8b-instant")
+LARGE_MODEL = os.getenv("GROQ_LARGE_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct")
+
+# Call site -> model tier it starts on. Small-tier calls escalate to the large
+# model when the question looks complex or the output fails validation.
+TASK_ROUTES = {
+    "extract_entities": "small",
+    "answer_no_relationships": "small",
+    "answer_overview": "small",
+    "answer": "small",
+}
+
+COMPLEX_QUESTION_PATTERN = re.compile(
+    r"\b(compare|comparison|difference|differ|versus|vs|why|how does|how do|explain|relationship between|impact|trend)\b",
+    re.IGNORECASE,
+)
+COMPLEX_MAX_WORDS = 25
+COMPLEX_MIN_ENTITIES = 3
+COMPLEX_MIN_FACTS = 15
+# Below this many latency samples the p95 is meaningless, so calls are not hedged
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+
+def is_complex_question(question: str, entity_count: int = 0, fact_count: int = 0) -> bool:
+    """Cheap heuristic for questions the small model tends to get wrong"""
+    return bool(
+        COMPLEX_QUESTION_PATTERN.search(question)
+        or len(question.split()) > COMPLEX_MAX_WORDS
+        or entity_count >= COMPLEX_MIN_ENTITIES
+        or fact_count >= COMPLEX_MIN_FACTS
+    )
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LLMRouter:
+    """Routes each LLM call site to a small or large Groq model and keeps
+    per-model latency and token accounting."""
+
+    def __init__(self, api_key: str, routes: Dict[str, str] = None, temperature: float = 0.1, models: Dict = None):
+        self.routes = routes or TASK_ROUTES
+        # Retries and timeouts are handled by the resilience layer, not the client
+        self.models = models or {
+            "small": ChatGroq(groq_api_key=api_key, model_name=SMALL_MODEL, temperature=temperature,
+                              timeout=LLM_TIMEOUT_SECONDS, max_retries=0),
+            "large": ChatGroq(groq_api_key=api_key, model_name=LARGE_MODEL, temperature=temperature,
+                              timeout=LLM_TIMEOUT_SECONDS, max_retries=0),
+        }
+        names = [model.model_name for model in self.models.values()]
+        self.guards = {name: ResilientCaller() for name in names}
+        self._lock = threading.Lock()
+        self._latencies = {name: deque(maxlen=500) for name in names}
+        self._stats = {
+            name: {"calls": 0, "errors": 0, "latency_ms_total": 0.0, "input_tokens": 0, "output_tokens": 0}
+            for name in names
+        }
+        self._escalations = {}
+
+    def _record(self, model_name: str, latency_ms: float, response=None, failed: bool = False):
+        usage = getattr(response, "usage_metadata", None) or {}
+        if not usage and response is not None:
+            token_usage = response.response_metadata.get("token_usage", {})
+            usage = {
+                "input_tokens": token_usage.get("prompt_tokens", 0),
+                "output_tokens": token_usage.get("completion_tokens", 0),
+            }
+
+        with self._lock:
+            stats = self._stats[model_name]
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["input_tokens"] += usage.get("input_tokens", 0)
+            stats["output_tokens"] += usage.get("output_tokens", 0)
+            # Latency covers successful calls only, like the p50/p95 samples
+            if not failed:
+                stats["latency_ms_total"] += latency_ms
+                self._latencies[model_name].append(latency_ms)
+
+    def _hedge_after_ms(self, model_name: str) -> Optional[float]:
+        """The model's recent p95, or None (no hedge) until enough calls have been timed"""
+        with self._lock:
+            latencies = list(self._latencies[model_name])
+        if len(latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return _percentile(latencies, 0.95)
+
+    def call(self, tier: str, prompt: str) -> str:
+        model = self.models[tier]
+
+        def attempt():
+            started = time.perf_counter()
+            try:
+                response = model.invoke(prompt)
+            except Exception:
+                self._record(model.model_name, (time.perf_counter() - started) * 1000, failed=True)
+                raise
+            self._record(model.model_name, (time.perf_counter() - started) * 1000, response)
+            return response
+
+        response = self.guards[model.model_name].call(attempt, hedge_after_ms=self._hedge_after_ms(model.model_name))
+        return response.content.strip()
+
+    def invoke(self, task: str, prompt: str, validate: Callable[[str], bool] = None,
+               complex_: bool = False) -> str:
+        """Run a prompt for a call site, escalating from the small to the large model when needed"""
+        tier = self.routes.get(task, "large")
+        if tier == "small" and complex_:
+            self._count_escalation(task, "complexity")
+            tier = "large"
+
+        try:
+            text = self.call(tier, prompt)
+        except LLMUnavailable:
+            if tier != "small":
+                raise
+            self._count_escalation(task, "unavailable")
+            return self.call("large", prompt)
+
+        if tier == "small" and validate and not validate(text):
+            self._count_escalation(task, "validation")
+            text = self.call("large", prompt)
+
+        return text
+
+    def _count_escalation(self, task: str, reason: str):
+        with self._lock:
+            counts = self._escalations.setdefault(task, {"complexity": 0, "validation": 0, "unavailable": 0})
+            counts[reason] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = {}
+            for name, stats in self._stats.items():
+                latencies = list(self._latencies[name])
+                successful = stats["calls"] - stats["errors"]
+                models[name] = {
+                    **stats,
+                    "avg_latency_ms": round(stats["latency_ms_total"] / successful, 1) if successful else 0.0,
+                    "p50_latency_ms": round(_percentile(latencies, 0.5), 1),
+                    "p95_latency_ms": round(_percentile(latencies, 0.95), 1),
+                    "resilience": self.guards[name].stats(),
+                }
+            return {"models": models, "routes": dict(self.routes), "escalations": dict(self._escalations)}
@@ -0,0 +1,55 @@
+import re
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Key for spotting duplicate questions: case, spacing and trailing punctuation ignored"""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").casefold()
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight wait on its future and receive the same result (or error).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"executed": 0, "collapsed": 0, "in_flight": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn() once per in-flight key; returns (result, shared_with_another_caller)"""
+        leader = False
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["collapsed"] += 1
+            else:
+                future = Future()
+                self._calls[key] = future
+                self._stats["executed"] += 1
+                self._stats["in_flight"] += 1
+                leader = True
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self._stats["in_flight"] -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
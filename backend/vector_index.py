@@ -0,0 +1,157 @@
+import os
+import time
+import uuid
+from typing import Dict, List
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+
+# flat | ivf_flat | ivf_pq | hnsw | sq_fp16 | sq8
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "8"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "48"))
+FAISS_PQ_NBITS = 8
+
+INDEX_TYPES = ["flat", "ivf_flat", "ivf_pq", "hnsw", "sq_fp16", "sq8"]
+
+
+def _nlist(n: int) -> int:
+    # ~4*sqrt(n) lists, but keep at least 39 training points per centroid
+    return max(1, min(int(4 * np.sqrt(n)), n // 39))
+
+
+def _pq_m(dim: int) -> int:
+    return max(m for m in range(1, min(FAISS_PQ_M, dim) + 1) if dim % m == 0)
+
+
+def factory_string(index_type: str, n: int, dim: int) -> str:
+    """Translate an index type name into a faiss.index_factory description"""
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "ivf_flat":
+        return f"IVF{_nlist(n)},Flat"
+    if index_type == "ivf_pq":
+        if n < 2 ** FAISS_PQ_NBITS:
+            print(f"Only {n} vectors, too few to train PQ; using ivf_flat instead")
+            return factory_string("ivf_flat", n, dim)
+        return f"IVF{_nlist(n)},PQ{_pq_m(dim)}x{FAISS_PQ_NBITS}"
+    if index_type == "hnsw":
+        return f"HNSW{FAISS_HNSW_M}"
+    if index_type == "sq_fp16":
+        return "SQfp16"
+    if index_type == "sq8":
+        return "SQ8"
+    raise ValueError(f"Unknown FAISS index type: {index_type}. Expected one of {INDEX_TYPES}")
+
+
+def apply_search_params(index, nprobe: int = None, ef_search: int = None):
+    """Set query-time knobs (IVF nprobe, HNSW efSearch); no-op for other index types"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or FAISS_NPROBE, ivf.nlist)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search or FAISS_EF_SEARCH
+
+
+def build_faiss_index(vectors: np.ndarray, index_type: str = None):
+    """Build, train and fill a FAISS index of the requested type"""
+    index_type = index_type or FAISS_INDEX_TYPE
+    n, dim = vectors.shape
+
+    index = faiss.index_factory(dim, factory_string(index_type, n, dim), faiss.METRIC_L2)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    apply_search_params(index)
+    return index
+
+
+def build_vector_store(documents: List[Document], embeddings, index_type: str = None) -> FAISS:
+    """Drop-in replacement for FAISS.from_documents with a configurable index type"""
+    vectors = np.asarray(
+        embeddings.embed_documents([doc.page_content for doc in documents]), dtype="float32"
+    )
+    index = build_faiss_index(vectors, index_type)
+
+    ids = [str(uuid.uuid4()) for _ in documents]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, documents))),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+
+
+def _search(index, queries: np.ndarray, k: int):
+    started = time.perf_counter()
+    _, labels = index.search(queries, k)
+    return labels, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def _recall(labels: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(labels, truth))
+    return hits / truth.size
+
+
+def benchmark_index_types(vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+                          index_types: List[str] = None) -> List[Dict]:
+    """Measure recall@k and per-query latency of each index type against the flat baseline"""
+    k = min(k, len(vectors))
+    baseline = build_faiss_index(vectors, "flat")
+    truth, flat_ms = _search(baseline, queries, k)
+
+    report = [{"index": "flat", "params": "", "build_s": 0.0, "recall": 1.0, "query_ms": flat_ms}]
+
+    for index_type in index_types or INDEX_TYPES[1:]:
+        started = time.perf_counter()
+        index = build_faiss_index(vectors, index_type)
+        build_s = time.perf_counter() - started
+
+        if faiss.try_extract_index_ivf(index) is not None:
+            sweep = [("nprobe", {"nprobe": v}) for v in (1, 4, 16, 64)]
+        elif hasattr(index, "hnsw"):
+            sweep = [("efSearch", {"ef_search": v}) for v in (16, 64, 256)]
+        else:
+            sweep = [("", {})]
+
+        for label, params in sweep:
+            apply_search_params(index, **params)
+            labels, query_ms = _search(index, queries, k)
+            value = next(iter(params.values()), "")
+            report.append({
+                "index": index_type,
+                "params": f"{label}={value}" if label else "",
+                "build_s": build_s,
+                "recall": _recall(labels, truth),
+                "query_ms": query_ms,
+            })
+
+    return report
+
+
+def print_report(report: List[Dict], k: int):
+    print(f"{'index':<10} {'params':<14} {'build (s)':>10} {f'recall@{k}':>10} {'ms/query':>10}")
+    for row in report:
+        print(f"{row['index']:<10} {row['params']:<14} {row['build_s']:>10.2f} "
+              f"{row['recall']:>10.3f} {row['query_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    index_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "faiss_index", "index.faiss")
+    stored = faiss.read_index(index_path)
+    vectors = stored.reconstruct_n(0, stored.ntotal)
+
+    # Perturbed copies of stored vectors stand in for real query embeddings
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(len(vectors), size=min(200, len(vectors)), replace=False)]
+    queries = (sample + rng.normal(scale=0.05, size=sample.shape)).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    k = 10
+    print(f"Benchmarking {len(vectors)} vectors of dim {vectors.shape[1]} with {len(queries)} queries")
+    print_report(benchmark_index_types(vectors, queries, k=k), k)